@@ -0,0 +1,346 @@
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import subprocess
+import numpy as np
+import pandas as pd
+import fixedincomeutils as fi
+import spotsource as ss
+from yieldcurve import YieldCurve, getcurve
+from bond import Bond
+from bondportfolio import BondPortfolio
+from interestrateswap import InterestRateSwap
+from swapbook import SwapBook
+from splinecurve import SplineCurve
+import yieldsolver as ys
+import hullwhite as hw
+from enums import Calendar, Compounding, InterpolationType, CurveMethod
+
+BASELINE = 'benchmark_baseline.json'
+TOLERANCE = 0.25
+NOISEFLOOR = 1e-3
+HEAVYMODULES = ('matplotlib', 'seaborn', 'scipy', 'ustreasurycurve', 'pandas_market_calendars')
+WORKER = '''
+import sys, json, time
+start = time.perf_counter()
+import spotsource as ss
+from bond import Bond
+imported = time.perf_counter() - start
+ss.setdefaultsource(ss.SyntheticSource())
+Bond(100, 0.04, 'Semi-Annual', '2034-06-20', '2024-06-18', 'Semi-Annual', '30/360', 'United States').price
+priced = time.perf_counter() - start
+print(json.dumps({'import': imported, 'priced': priced, 'heavy': [m for m in %r if m in sys.modules]}))
+''' % (HEAVYMODULES,)
+
+
+def randombonds(size, valuationdate, calendar = Calendar.US, seed = 0):
+    rng = np.random.default_rng(seed)
+    valuationdate = pd.to_datetime(valuationdate)
+    maturities = valuationdate + pd.to_timedelta(rng.integers(2 * 365, 30 * 365, size), unit = 'D')
+    return {
+        'facevalue': rng.choice([100, 1000, 10000], size),
+        'couponrate': rng.integers(0, 40, size) / 400,
+        'frequency': rng.choice(['Monthly', 'Quarterly', 'Semi-Annual', 'Annual'], size),
+        'maturitydate': fi.businessdayadjust(maturities, calendar.value),
+        'convention': rng.choice(['30/360', 'Actual/Actual', 'Actual/365', 'Actual/360'], size)
+    }
+
+
+def randomswaps(size, valuationdate, calendar = Calendar.US, seed = 0):
+    rng = np.random.default_rng(seed)
+    valuationdate = pd.to_datetime(valuationdate)
+    maturities = valuationdate + pd.to_timedelta(rng.integers(365, 30 * 365, size), unit = 'D')
+    return {
+        'notional': rng.choice([1e6, 5e6, 1e7, 5e7], size),
+        'fixedrate': rng.integers(4, 24, size) / 400,
+        'frequency': rng.choice(['Quarterly', 'Semi-Annual', 'Annual'], size),
+        'maturitydate': fi.businessdayadjust(maturities, calendar.value),
+        'convention': rng.choice(['30/360', 'Actual/360', 'Actual/365'], size)
+    }
+
+
+def benchmark_bondportfolio(size = 1000, loopsize = 10, valuationdate = '2024-06-18', compounding = 'Semi-Annual', region = 'United States'):
+    bonds = randombonds(size, valuationdate)
+
+    start = time.perf_counter()
+    portfolio = BondPortfolio(valuationdate = valuationdate, compounding = compounding, region = region, **bonds)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(loopsize):
+        Bond(bonds['facevalue'][i], bonds['couponrate'][i], bonds['frequency'][i], bonds['maturitydate'][i], valuationdate, compounding, bonds['convention'][i], region).price
+    looped = (time.perf_counter() - start) / loopsize * size
+
+    return {'Bonds': len(portfolio), 'BondPortfolio (s)': vectorized, 'Bond loop (s, extrapolated)': looped, 'Speedup': looped / vectorized}
+
+
+def benchmark_swapbook(size = 1000, loopsize = 10, valuationdate = '2024-06-18', compounding = 'Semi-Annual', region = 'United States'):
+    swaps = randomswaps(size, valuationdate)
+
+    start = time.perf_counter()
+    book = SwapBook(valuationdate = valuationdate, compounding = compounding, region = region, **swaps)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(loopsize):
+        InterestRateSwap(swaps['notional'][i], swaps['fixedrate'][i], swaps['frequency'][i], swaps['maturitydate'][i], valuationdate, compounding, swaps['convention'][i], region).npv
+    looped = (time.perf_counter() - start) / loopsize * size
+
+    return {'Swaps': len(book), 'SwapBook (s)': vectorized, 'InterestRateSwap loop (s, extrapolated)': looped, 'Speedup': looped / vectorized}
+
+
+def benchmark_yieldsolver(size = 1000000, periods = 20, compounding = Compounding.SEMIANNUAL, seed = 0):
+    rng = np.random.default_rng(seed)
+    times = np.arange(1, periods + 1) / 2 * np.ones((size, 1))
+    cashflows = np.full((size, periods), 2.5)
+    cashflows[:, -1] += 100
+    prices = rng.uniform(80, 120, size)
+
+    start = time.perf_counter()
+    yields = ys.yieldtomaturity(prices, times, cashflows, compounding)
+    elapsed = time.perf_counter() - start
+    error = np.abs(ys.pricefromyield(yields, times, cashflows, compounding) - prices).max()
+    return {'Bonds': size, 'Cash Flows': periods, 'Seconds': elapsed, 'Bonds per Second': size / elapsed, 'Max Price Error': error}
+
+
+def benchmark_instruments(count = 10000, valuationdate = '2024-06-18', compounding = 'Semi-Annual', region = 'United States'):
+    bonds = randombonds(count, valuationdate)
+    swaps = randomswaps(count, valuationdate)
+    makebonds = lambda: [Bond(bonds['facevalue'][i], bonds['couponrate'][i], bonds['frequency'][i], bonds['maturitydate'][i], valuationdate, compounding, bonds['convention'][i], region) for i in range(count)]
+    makeswaps = lambda: [InterestRateSwap(swaps['notional'][i], swaps['fixedrate'][i], swaps['frequency'][i], swaps['maturitydate'][i], valuationdate, compounding, swaps['convention'][i], region) for i in range(count)]
+    getcurve(region, valuationdate, compounding).nssparams
+
+    results = {'Instruments': count}
+    for name, make, output in [('Bond', makebonds, 'price'), ('InterestRateSwap', makeswaps, 'npv')]:
+        start = time.perf_counter()
+        held = make()
+        results[f'{name} construction (us)'] = (time.perf_counter() - start) / count * 1e6
+        start = time.perf_counter()
+        [getattr(x, output) for x in held]
+        results[f'{name} {output} (us)'] = (time.perf_counter() - start) / count * 1e6
+        del held
+
+        gc.collect()
+        tracemalloc.start()
+        held = make()
+        results[f'{name} held (KiB)'] = tracemalloc.get_traced_memory()[0] / count / 1024
+        [getattr(x, output) for x in held]
+        results[f'{name} held with {output} (KiB)'] = tracemalloc.get_traced_memory()[0] / count / 1024
+        tracemalloc.stop()
+        del held
+    return results
+
+
+def benchmark_montecarlo_convergence(paths = (1000, 10000, 100000), maturities = (1, 5, 10, 30), firstexercise = 2, valuationdate = '2024-06-18', compounding = 'Semi-Annual', region = 'United States', meanreversion = 0.03, volatility = 0.01, seed = 0):
+    curve = getcurve(region, valuationdate, compounding)
+    model = hw.HullWhite(curve, meanreversion, volatility)
+    bond = Bond(100, 0.05, 'Semi-Annual', '2034-06-20', valuationdate, compounding, '30/360', region, yieldcurve = curve)
+    results = []
+    for n in paths:
+        zerocoupons = hw.zerocouponbonds(model, maturities, paths = n, seed = seed)
+        callablebond = hw.embeddedoptionbond(model, bond, 'Callable', firstexercise, paths = n, pilotpaths = min(n, hw.PILOTPATHS), seed = seed)
+        results.append({
+            'Paths': n,
+            'Max Discount Factor Error': (zerocoupons['Monte Carlo'] - zerocoupons['Discount Factor']).abs().max(),
+            'Max Discount Factor Error (SE)': ((zerocoupons['Monte Carlo'] - zerocoupons['Discount Factor']).abs() / zerocoupons['Standard Error']).max(),
+            'Callable Price': callablebond['Price'],
+            'Callable Standard Error': callablebond['Standard Error']
+        })
+    return results
+
+
+def benchmark_montecarlo_throughput(paths = 200000, chunksizes = (1000, 5000, 20000, 100000), processes = None, valuationdate = '2024-06-18', compounding = 'Semi-Annual', region = 'United States', seed = 0):
+    curve = getcurve(region, valuationdate, compounding)
+    model = hw.HullWhite(curve)
+    bond = Bond(100, 0.05, 'Semi-Annual', '2034-06-20', valuationdate, compounding, '30/360', region, yieldcurve = curve)
+    swap = InterestRateSwap(1e6, 0.045, 'Annual', '2034-06-20', valuationdate, compounding, '30/360', region, yieldcurve = curve)
+    results = []
+    for chunksize in chunksizes:
+        start = time.perf_counter()
+        hw.embeddedoptionbond(model, bond, 'Callable', paths = paths, chunksize = chunksize, seed = seed, processes = processes)
+        callablebond = time.perf_counter() - start
+        start = time.perf_counter()
+        hw.swaption(model, swap, 2, 'Payer', paths = paths, chunksize = chunksize, seed = seed, processes = processes)
+        swaption = time.perf_counter() - start
+        results.append({'Chunk Size': chunksize, 'Processes': processes or 1, 'Callable Paths per Second': paths / callablebond, 'Swaption Paths per Second': paths / swaption})
+    return results
+
+
+def benchmark_curvemethods(size = 100000, count = 100, repeat = 3, valuationdate = '2024-06-18', compounding = 'Semi-Annual', region = 'United States', source = None, seed = 0):
+    source = source if source else ss.SyntheticSource()
+    times = np.random.default_rng(seed).uniform(0, 30, size)
+    results = []
+    for method in CurveMethod:
+        curve = YieldCurve(region, valuationdate, compounding, source = source, method = method)
+        ts = curve.spotrates
+        time, spot = ts['time'].to_numpy(dtype = float), ts['spot'].to_numpy(dtype = float)
+        build = (lambda: curve._calculate_params()) if method == CurveMethod.NSS else (lambda: SplineCurve(time, spot, method))
+        built = _timeit(lambda: [build() for _ in range(count)], repeat) / count
+        row = {'Method': method.value, 'Build (us)': built * 1e6, 'Max Pillar Error': np.abs(curve.interpolate(time, InterpolationType.SPOT) - spot).max()}
+        for type in InterpolationType:
+            row[f'{type.value} (points per second)'] = size / _timeit(lambda: curve.interpolate(times, type), repeat)
+        results.append(row)
+    return results
+
+
+def benchmark_imports(repeat = 5):
+    directory = os.path.dirname(os.path.abspath(__file__))
+    runs = [json.loads(subprocess.run([sys.executable, '-c', WORKER], cwd = directory, capture_output = True, text = True, check = True).stdout) for _ in range(repeat)]
+    return {
+        'Import bond (s)': min(run['import'] for run in runs),
+        'Import and first price (s)': min(run['priced'] for run in runs),
+        'Heavy modules loaded': runs[0]['heavy']
+    }
+
+
+def _timeit(function, repeat = 3, setup = None):
+    function()
+    best = np.inf
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def suite(sizes = (100, 1000, 10000), counts = (10, 100), repeat = 3, valuationdate = '2024-06-18', compounding = 'Semi-Annual', region = 'United States', source = None, seed = 0):
+    source = source if source else ss.SyntheticSource()
+    rng = np.random.default_rng(seed)
+    curve = YieldCurve(region, valuationdate, compounding, source = source)
+    splines = [YieldCurve(region, valuationdate, compounding, source = source, method = method) for method in CurveMethod if method != CurveMethod.NSS]
+    results = {}
+
+    for size in sizes:
+        dates = pd.to_datetime(valuationdate) + pd.to_timedelta(rng.integers(0, 30 * 365, size), unit = 'D')
+        bonds = randombonds(size, valuationdate, seed = seed)
+        times = rng.uniform(0, 30, size)
+        results[f'businessdayadjust[{size}]'] = _timeit(lambda: fi.businessdayadjust(dates, curve.calendar.value), repeat)
+        results[f'datetotime[{size}]'] = _timeit(lambda: fi.datetotime(dates, valuationdate, '30/360'), repeat)
+        results[f'paymenttimematrix[{size}]'] = _timeit(lambda: fi.paymenttimematrix(valuationdate, bonds['maturitydate'], bonds['frequency'], bonds['convention'], curve.calendar.value), repeat, fi._dateschedule.cache_clear)
+        for type in InterpolationType:
+            results[f'interpolate {type.value}[{size}]'] = _timeit(lambda: curve.interpolate(times, type), repeat)
+            for spline in splines:
+                results[f'interpolate {spline.method.value} {type.value}[{size}]'] = _timeit(lambda: spline.interpolate(times, type), repeat)
+
+    for count in counts:
+        bonds = randombonds(count, valuationdate, seed = seed)
+        swaps = randomswaps(count, valuationdate, seed = seed)
+        dates = pd.to_datetime(valuationdate) + pd.to_timedelta(rng.integers(1, 30 * 365, count), unit = 'D')
+        start = pd.to_datetime(valuationdate)
+
+        def schedules():
+            for maturity, frequency in zip(bonds['maturitydate'], bonds['frequency']):
+                fi.dateschedule(valuationdate, maturity, frequency)
+
+        def yearfractions():
+            for date in dates:
+                fi.yearfraction(start, date, 'Actual/Actual')
+
+        def fits():
+            for _ in range(count):
+                curve._calculate_params()
+
+        def splinefits():
+            for _ in range(count):
+                for spline in splines:
+                    SplineCurve(spline.spotrates['time'], spline.spotrates['spot'], spline.method)
+
+        def bondloop():
+            for i in range(count):
+                Bond(bonds['facevalue'][i], bonds['couponrate'][i], bonds['frequency'][i], bonds['maturitydate'][i], valuationdate, compounding, bonds['convention'][i], region, yieldcurve = curve).price
+
+        def swaploop():
+            for i in range(count):
+                InterestRateSwap(swaps['notional'][i], swaps['fixedrate'][i], swaps['frequency'][i], swaps['maturitydate'][i], valuationdate, compounding, swaps['convention'][i], region, yieldcurve = curve).npv
+
+        results[f'dateschedule[{count}]'] = _timeit(schedules, repeat, fi._dateschedule.cache_clear)
+        results[f'yearfraction[{count}]'] = _timeit(yearfractions, repeat)
+        results[f'_calculate_params[{count}]'] = _timeit(fits, repeat)
+        results[f'SplineCurve[{count}]'] = _timeit(splinefits, repeat)
+        results[f'Bond[{count}]'] = _timeit(bondloop, repeat, fi._dateschedule.cache_clear)
+        results[f'InterestRateSwap[{count}]'] = _timeit(swaploop, repeat, fi._dateschedule.cache_clear)
+
+    return {
+        'metadata': {
+            'timestamp': pd.Timestamp.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'source': repr(source),
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare(results, baseline, tolerance = TOLERANCE, floor = NOISEFLOOR):
+    current, reference = pd.Series(results['results']), pd.Series(baseline['results'])
+    table = pd.DataFrame({'Baseline (s)': reference, 'Current (s)': current}).dropna()
+    table['Ratio'] = table['Current (s)'] / table['Baseline (s)']
+    table['Regression'] = (table['Ratio'] > 1 + tolerance) & (table['Current (s)'] - table['Baseline (s)'] > floor)
+    return table
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Offline benchmark suite for schedule, calendar, day count, curve fit and pricing paths')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [100, 1000, 10000])
+    parser.add_argument('--counts', type = int, nargs = '+', default = [10, 100])
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--output', help = 'write results as JSON to this path')
+    parser.add_argument('--save', nargs = '?', const = BASELINE, help = f'store results as the baseline (default {BASELINE})')
+    parser.add_argument('--baseline', nargs = '?', const = BASELINE, help = f'compare results against a stored baseline (default {BASELINE})')
+    parser.add_argument('--tolerance', type = float, default = TOLERANCE)
+    parser.add_argument('--imports', action = 'store_true', help = 'also time the cold start of a pricing-only worker process')
+    parser.add_argument('--books', action = 'store_true', help = 'also run the BondPortfolio, SwapBook and yield solver comparisons')
+    parser.add_argument('--curves', action = 'store_true', help = 'also compare NSS and spline curve build and query throughput')
+    parser.add_argument('--montecarlo', action = 'store_true', help = 'also run the Hull-White convergence and paths per second benchmarks')
+    parser.add_argument('--processes', type = int, help = 'worker processes for the Monte Carlo throughput benchmark')
+    args = parser.parse_args(argv)
+
+    source = ss.SyntheticSource()
+    results = suite(args.sizes, args.counts, args.repeat, source = source)
+    if args.imports:
+        results['imports'] = benchmark_imports()
+    if args.books:
+        previous = ss.getdefaultsource()
+        ss.setdefaultsource(source)
+        try:
+            results['books'] = [benchmark_bondportfolio(size) for size in args.sizes] + [benchmark_swapbook(size) for size in args.sizes] + [benchmark_yieldsolver()] + [benchmark_instruments()]
+        finally:
+            ss.setdefaultsource(previous)
+    if args.curves:
+        results['curves'] = benchmark_curvemethods(source = source)
+    if args.montecarlo:
+        previous = ss.getdefaultsource()
+        ss.setdefaultsource(source)
+        try:
+            results['montecarlo'] = {'convergence': benchmark_montecarlo_convergence(), 'throughput': benchmark_montecarlo_throughput(processes = args.processes)}
+        finally:
+            ss.setdefaultsource(previous)
+
+    print(json.dumps(results, indent = 2, default = float))
+    for path in (args.output, args.save):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(results, f, indent = 2, default = float)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            table = compare(results, json.load(f), args.tolerance)
+        print(table.to_string())
+        if table['Regression'].any():
+            print(f'Regressions beyond {args.tolerance:.0%}: {", ".join(table.index[table["Regression"]])}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,21 @@
+import logging
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from yieldcurve import YieldCurve
+from yieldcurve import getcurve
 from enums import Compounding, Region, Currency, Calendar, Frequency, Convention
 import validation as v
 import fixedincomeutils as fi
+import risk
+import yieldsolver as ys
+from profiling import timed
+
+logger = logging.getLogger(__name__)
 
 class Bond:
-    def __init__(self, facevalue, couponrate, frequency, maturitydate, valuationdate, compounding, convention, region, currency = None, calendar = None):	
+    __slots__ = ('facevalue', 'couponrate', 'frequency', 'region', 'currency', 'calendar', 'compounding', 'convention', 'maturitydate', 'valuationdate', 'yieldcurve', '_cache')
+
+    @timed
+    def __init__(self, facevalue, couponrate, frequency, maturitydate, valuationdate, compounding, convention, region, currency = None, calendar = None, yieldcurve = None):	
         self.facevalue = facevalue
         self.couponrate = couponrate
         self.frequency = v.validate_enum(frequency, Frequency, 'frequency')
@@ -19,42 +26,48 @@ class Bond:
         self.convention = v.validate_enum(convention, Convention, 'convention')
         self.maturitydate = v.validate_date(maturitydate, self.calendar)
         self.valuationdate = v.validate_date(valuationdate, self.calendar)
-        print(self.__repr__())
-        self.paymentdates = self._paymentdates()
-        self.paymenttimes = self._paymenttimes()
-        self.cashflows = self._cashflows()
-        self.yieldcurve = YieldCurve(self.region, self.valuationdate, self.compounding, self.currency, self.calendar)
-        self.discountfactors = self._discountfactors()
-        self.price = self._price()
-        self.valuationtable = self._valuationtable()
-        self.duration = self._duration()
-        self.convexity = self._convexity()
+        self.yieldcurve = v.validate_curve(yieldcurve, self.valuationdate, self.compounding, self.region, self.currency, self.calendar) if yieldcurve else getcurve(self.region, self.valuationdate, self.compounding, self.currency, self.calendar)
+        self._cache = {}
+        logger.debug('%r', self)
 
     def __repr__(self):
         return f'Bond(facevalue = {self.facevalue:,}, couponrate = {self.couponrate :.2%}, frequency = {self.frequency.value}, maturitydate = {self.maturitydate.date()}, valuationdate = {self.valuationdate.date()}, region = {self.region.value}, currency = {self.currency.value}, compounding = {self.compounding.value}, calendar = {self.calendar.value}, convention = {self.convention.value})'
     
-    def _paymentdates(self):
+    @fi.lazyproperty
+    @timed
+    def paymentdates(self):
         dates = fi.dateschedule(self.valuationdate, self.maturitydate, self.frequency.value)
         return fi.businessdayadjust(dates, self.calendar.value)
 
-    def _paymenttimes(self):
+    @fi.lazyproperty
+    @timed
+    def paymenttimes(self):
         return fi.datetotime(self.paymentdates, self.valuationdate, self.convention.value)
 
-    def _cashflows(self):
-        FREQMAP = {'Weekly':52, 'Monthly':12, 'Quarterly':4, 'Semi-Annual':2, 'Annual':1}
-        cashflows = [self.facevalue * self.couponrate / FREQMAP.get(self.frequency.value, None)] * len(self.paymentdates)
+    @fi.lazyproperty
+    @timed
+    def cashflows(self):
+        cashflows = np.full(len(self.paymentdates), self.facevalue * self.couponrate / fi.FREQMAP.get(self.frequency.value, None), dtype = float)
         cashflows[-1] += self.facevalue
         return cashflows
 
-    def _discountfactors(self):
-        return self.yieldcurve.interpolate(self.paymenttimes, 'Discount Factor')
+    @fi.lazyproperty
+    def spotrates(self):
+        return self.yieldcurve.interpolate(self.paymenttimes, 'Spot Rate')
+
+    @fi.lazyproperty
+    @timed
+    def discountfactors(self):
+        return fi.discount(self.paymenttimes, self.spotrates, self.compounding)
 
-    def _price(self):
-        cashflows = np.asarray(self.cashflows, dtype = float)
-        discountfactors = np.asarray(self.discountfactors, dtype = float)
-        return cashflows @ discountfactors
+    @fi.lazyproperty
+    @timed
+    def price(self):
+        return self.cashflows @ np.asarray(self.discountfactors, dtype = float)
 
-    def _valuationtable(self):
+    @fi.lazyproperty
+    @timed
+    def valuationtable(self):
         table = pd.DataFrame({
             'Payment Date': self.paymentdates,
             'Time': self.paymenttimes,
@@ -63,38 +76,41 @@ class Bond:
             'Present Value': self.cashflows * self.discountfactors
         })
         return table[table['Cash Flow'] != 0].reset_index(drop = True)
+
+    @fi.lazyproperty
+    def _riskmeasures(self):
+        return risk.riskmeasures(self.paymenttimes, self.cashflows, self.spotrates, self.compounding)
+
+    @property
+    def macaulayduration(self):
+        return self._riskmeasures['Macaulay Duration']
+
+    @property
+    def duration(self):
+        return self._riskmeasures['Modified Duration']
+
+    @property
+    def convexity(self):
+        return self._riskmeasures['Convexity']
+
+    @property
+    def dv01(self):
+        return self._riskmeasures['DV01']
     
-    def _duration(self):
-        duration = 0
-        if self.compounding == Compounding.CONTINUOUS:
-            for i, cf in enumerate(self.cashflows):
-                duration += self.paymenttimes[i] * cf * self.discountfactors(i) / self.price
-        else:
-            k = fi.COMPOUND_MAP.get(self.compounding, None)
-            rates = self.yieldcurve.interpolate(self.paymenttimes, 'Spot Rate')
-            for i, cf in enumerate(self.cashflows):
-                duration += ((-self.paymenttimes[i] / k) * cf * (1 + rates[i] / k) ** (-self.paymenttimes[i] - 1)) / self.price
-        return duration
+    @fi.lazyproperty
+    @timed
+    def keyratedurations(self):
+        return pd.Series(risk.keyratedurations(self.paymenttimes, self.cashflows, self.spotrates, self.compounding), index = list(fi.TENORMAP), name = 'Key Rate Duration')
     
-    def _convexity(self):
-        convexity = 0
-        if self.compounding == Compounding.CONTINUOUS:
-            for i, cf in enumerate(self.cashflows):
-                convexity += (self.paymenttimes[i] ** 2) * cf * self.discountfactors(i) / self.price
-        else:
-            k = fi.COMPOUND_MAP.get(self.compounding, None)
-            rates = self.yieldcurve.interpolate(self.paymenttimes, 'Spot Rate')
-            for i, cf in enumerate(self.cashflows):
-                convexity += ((self.paymenttimes[i] * (self.paymenttimes[i] + 1)) * (1 / k ** 2) * cf * (1 + rates[i] / k) ** (-self.paymenttimes[i] - 2)) / self.price
-        return convexity
+    def yieldtomaturity(self, price = None):
+        return ys.yieldtomaturity(self.price if price is None else price, self.paymenttimes, self.cashflows, self.compounding)[0]
+
+    def pricefromyield(self, ytm):
+        return ys.pricefromyield(ytm, self.paymenttimes, self.cashflows, self.compounding)[0]
+
+    def zspread(self, price):
+        return ys.zspread(price, self.paymenttimes, self.cashflows, self.spotrates, self.compounding)[0]
     
     def plot(self, type):
-        PLOTSTYLE = {'axes.edgecolor':'#505258', 'grid.linestyle':'dashed', 'grid.color':'white', 'axes.facecolor':'#E8E9EB'}
-        sns.set_style('whitegrid', rc = PLOTSTYLE)
-        plt.figure(figsize = (12,8))
-        sns.barplot(x = self.paymentdates, y = self.valuationtable[type], color = '#4062BB')
-        plt.title(f'{self.region.value} Bond {type} ({self.valuationdate.date()})')
-        plt.xlabel('Date')
-        plt.ylabel(type)
-        plt.grid(True, axis = 'y')
-        plt.show()
\ No newline at end of file
+        import plotting
+        return plotting.plotbond(self, type)
@@ -0,0 +1,82 @@
+import logging
+import pandas as pd
+import numpy as np
+from yieldcurve import getcurve
+from enums import Compounding, Region, Currency, Calendar, Frequency, Convention
+import validation as v
+import fixedincomeutils as fi
+import risk
+import yieldsolver as ys
+
+logger = logging.getLogger(__name__)
+
+class BondPortfolio:
+    def __init__(self, facevalue, couponrate, frequency, maturitydate, valuationdate, compounding, convention, region, currency = None, calendar = None, yieldcurve = None):
+        columns = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype = object)) for x in (facevalue, couponrate, frequency, maturitydate, convention)])
+        self.region = v.validate_enum(region, Region, 'region')
+        self.currency = v.validate_enum(currency, Currency, 'currency') if currency else v.default_currency(self.region)
+        self.calendar = v.validate_enum(calendar, Calendar, 'calendar') if calendar else v.default_calendar(self.region)
+        self.compounding = v.validate_enum(compounding, Compounding, 'compounding')
+        self.valuationdate = v.validate_date(valuationdate, self.calendar)
+        self.facevalue = columns[0].astype(float)
+        self.couponrate = columns[1].astype(float)
+        self.frequency = v.validate_enum_column(columns[2], Frequency, 'frequency')
+        self.convention = v.validate_enum_column(columns[4], Convention, 'convention')
+        self.maturitydate = v.validate_date_column(columns[3], self.calendar)
+        logger.debug('%r', self)
+        self.paymenttimes, self.paymentcounts = self._paymenttimes()
+        self.cashflows = self._cashflows()
+        self.yieldcurve = v.validate_curve(yieldcurve, self.valuationdate, self.compounding, self.region, self.currency, self.calendar) if yieldcurve else getcurve(self.region, self.valuationdate, self.compounding, self.currency, self.calendar)
+        self.spotrates = self.yieldcurve.interpolate(self.paymenttimes, 'Spot Rate')
+        self.discountfactors = fi.discount(self.paymenttimes, self.spotrates, self.compounding)
+        self.price = self._price()
+        measures = risk.riskmeasures(self.paymenttimes, self.cashflows, self.spotrates, self.compounding)
+        self.macaulayduration = measures['Macaulay Duration']
+        self.duration = measures['Modified Duration']
+        self.convexity = measures['Convexity']
+        self.dv01 = measures['DV01']
+        self.keyratedurations = risk.keyratedurations(self.paymenttimes, self.cashflows, self.spotrates, self.compounding)
+        self.valuationtable = self._valuationtable()
+
+    def __repr__(self):
+        return f'BondPortfolio(size = {len(self):,}, valuationdate = {self.valuationdate.date()}, region = {self.region.value}, currency = {self.currency.value}, compounding = {self.compounding.value}, calendar = {self.calendar.value})'
+
+    def __len__(self):
+        return len(self.facevalue)
+
+    def _paymenttimes(self):
+        return fi.paymenttimematrix(self.valuationdate, self.maturitydate, [f.value for f in self.frequency], [c.value for c in self.convention], self.calendar.value)
+
+    def _cashflows(self):
+        periods = np.array([fi.FREQMAP.get(f.value, None) for f in self.frequency], dtype = float)
+        mask = np.arange(self.paymenttimes.shape[1]) < self.paymentcounts[:, None]
+        cashflows = np.where(mask, (self.facevalue * self.couponrate / periods)[:, None], 0.0)
+        paid = self.paymentcounts > 0
+        cashflows[np.flatnonzero(paid), self.paymentcounts[paid] - 1] += self.facevalue[paid]
+        return cashflows
+
+    def _price(self):
+        return np.einsum('ij,ij->i', self.cashflows, self.discountfactors)
+
+    def yieldtomaturity(self, prices = None):
+        return ys.yieldtomaturity(self.price if prices is None else prices, self.paymenttimes, self.cashflows, self.compounding)
+
+    def pricefromyield(self, yields):
+        return ys.pricefromyield(yields, self.paymenttimes, self.cashflows, self.compounding)
+
+    def zspread(self, prices):
+        return ys.zspread(prices, self.paymenttimes, self.cashflows, self.spotrates, self.compounding)
+
+    def _valuationtable(self):
+        return pd.DataFrame({
+            'Face Value': self.facevalue,
+            'Coupon Rate': self.couponrate,
+            'Frequency': [f.value for f in self.frequency],
+            'Maturity Date': self.maturitydate,
+            'Convention': [c.value for c in self.convention],
+            'Price': self.price,
+            'Macaulay Duration': self.macaulayduration,
+            'Duration': self.duration,
+            'Convexity': self.convexity,
+            'DV01': self.dv01
+        })
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import threading
+from enums import Calendar, BusinessDayConvention
+from profiling import timed
+
+DEFAULTYEARS = (1990, 2080)
+
+
+def todays(dates):
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+        return np.atleast_1d(dates.astype('datetime64[D]'))
+    if isinstance(dates, pd.Timestamp):
+        return np.array([dates.to_datetime64()], dtype = 'datetime64[D]')
+    if isinstance(dates, pd.DatetimeIndex) and dates.tz is None:
+        return np.asarray(dates.values, dtype = 'datetime64[D]')
+    return np.asarray(pd.DatetimeIndex(np.atleast_1d(pd.to_datetime(dates))).values, dtype = 'datetime64[D]')
+
+
+class BusinessDayIndex:
+
+    @timed
+    def __init__(self, calendar, startyear, endyear):
+        self.calendar = calendar.value if isinstance(calendar, Calendar) else calendar
+        self.startyear = startyear
+        self.endyear = endyear
+        import pandas_market_calendars as mcal
+        cal = mcal.get_calendar(self.calendar)
+        days = cal.valid_days(start_date = f'{startyear}-01-01', end_date = f'{endyear}-12-31')
+        self.days = np.asarray(days.tz_localize(None).values, dtype = 'datetime64[D]')
+        self.days.flags.writeable = False
+
+
+    def __repr__(self):
+        return f'BusinessDayIndex(calendar = {self.calendar}, startyear = {self.startyear}, endyear = {self.endyear}, days = {len(self.days):,})'
+
+
+    def covers(self, start, end):
+        return self.startyear < pd.to_datetime(start).year and pd.to_datetime(end).year < self.endyear
+
+
+    def isbusinessday(self, dates):
+        dates = todays(dates)
+        i = np.minimum(np.searchsorted(self.days, dates), len(self.days) - 1)
+        return self.days[i] == dates
+
+
+    def following(self, dates):
+        return self.days[np.searchsorted(self.days, todays(dates), side = 'left')]
+
+
+    def preceding(self, dates):
+        return self.days[np.searchsorted(self.days, todays(dates), side = 'right') - 1]
+
+
+    def adjust(self, dates, convention = BusinessDayConvention.FOLLOWING):
+        if convention == BusinessDayConvention.PRECEDING:
+            return self.preceding(dates)
+        adjusted = self.following(dates)
+        if convention == BusinessDayConvention.MODIFIEDFOLLOWING:
+            rolled = adjusted.astype('datetime64[M]') != todays(dates).astype('datetime64[M]')
+            adjusted = np.where(rolled, self.preceding(dates), adjusted)
+        return adjusted
+
+
+
+_INDEXES = {}
+_LOCK = threading.Lock()
+
+@timed
+def businessdayindex(calendar, start = None, end = None):
+    calendar = calendar.value if isinstance(calendar, Calendar) else calendar
+    start = pd.to_datetime(start if start is not None else f'{DEFAULTYEARS[0] + 1}-01-01')
+    end = pd.to_datetime(end if end is not None else start)
+    with _LOCK:
+        index = _INDEXES.get(calendar)
+        if index is None or not index.covers(start, end):
+            startyear = min(DEFAULTYEARS[0], start.year - 1) if index is None else min(index.startyear, start.year - 1)
+            endyear = max(DEFAULTYEARS[1], end.year + 1) if index is None else max(index.endyear, end.year + 1)
+            index = _INDEXES[calendar] = BusinessDayIndex(calendar, startyear, endyear)
+        return index
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import fixedincomeutils as fi
+from profiling import timed
+
+NSSPARAMS = ['beta0', 'beta1', 'beta2', 'beta3', 'lambda0', 'lambda1']
+INITIAL = [0.03, -0.02, 0.01, 0.05, 2.0, 5.0]
+LAMBDABOUNDS = (1e-2, 1e2)
+
+
+@timed
+def fitnss(time, spot, initial = None):
+    from scipy.optimize import curve_fit
+    if initial is None:
+        initial = INITIAL
+    return curve_fit(fi.nelsonsiegelsvensson, time, spot, p0 = initial, jac = fi.nssjacobian)[0]
+
+
+def _degenerate(params):
+    return not (np.all(np.isfinite(params)) and np.all((LAMBDABOUNDS[0] <= params[4:]) & (params[4:] <= LAMBDABOUNDS[1])))
+
+
+def _calibrate(spots, time, initial = None):
+    params = np.full((len(spots), len(NSSPARAMS)), np.nan)
+    previous = initial
+    for i, row in enumerate(spots):
+        mask = np.isfinite(row)
+        if mask.sum() < len(NSSPARAMS):
+            continue
+        fits = []
+        for guess in (previous, None):
+            try:
+                fit = fitnss(time[mask], row[mask], guess)
+            except (RuntimeError, ValueError):
+                continue
+            fits.append(fit)
+            if not _degenerate(fit):
+                break
+        if fits:
+            params[i] = min(fits, key = lambda p: (_degenerate(p), np.sum((fi.nelsonsiegelsvensson(time[mask], *p) - row[mask]) ** 2)))
+            if not _degenerate(params[i]):
+                previous = params[i]
+    return params
+
+
+def refit(time, spot, initial = None):
+    return _calibrate(np.asarray(spot, dtype = float)[None, :], np.asarray(time, dtype = float), initial)[0]
+
+
+def calibrate(spots, initial = None, processes = None, chunksize = 250):
+    time = np.asarray(spots.columns.map(fi.TENORMAP), dtype = float)
+    matrix = spots.to_numpy(dtype = float)
+    if processes is None or processes <= 1 or len(matrix) <= chunksize:
+        params = _calibrate(matrix, time, initial)
+    else:
+        chunks = [matrix[i:i + chunksize] for i in range(0, len(matrix), chunksize)]
+        with ProcessPoolExecutor(max_workers = processes) as pool:
+            params = np.concatenate(list(pool.map(_calibrate, chunks, repeat(time), repeat(initial))))
+
+    failed = np.isnan(params).any(axis = 1).sum()
+    if failed:
+        warnings.warn(f'Curve fitting failed on {failed} of {len(params)} dates', RuntimeWarning)
+    return pd.DataFrame(params, index = spots.index, columns = NSSPARAMS)
@@ -0,0 +1,80 @@
+import numpy as np
+import validation as v
+from businessdays import todays
+from enums import Convention
+
+
+def isleapyear(year):
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def _components(dates):
+    years = dates.astype('datetime64[Y]')
+    months = dates.astype('datetime64[M]')
+    return years.astype(int) + 1970, (months - years.astype('datetime64[M]')).astype(int) + 1, (dates - months.astype('datetime64[D]')).astype(int) + 1
+
+
+def _thirty360(y1, m1, d1, y2, m2, d2):
+    return (360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)) / 360
+
+
+def _dc30360(start, end):
+    return _thirty360(*_components(start), *_components(end))
+
+
+def _dc30u360(start, end):
+    y1, m1, d1 = _components(start)
+    y2, m2, d2 = _components(end)
+    feb1 = (m1 == 2) & ((d1 == 28) | (d1 == 29))
+    feb2 = (m2 == 2) & ((d2 == 28) | (d2 == 29))
+    d2 = np.where(feb1 & feb2, 30, d2)
+    d1 = np.where(feb1, 30, d1)
+    d2 = np.where((d2 == 31) & (d1 >= 30), 30, d2)
+    d1 = np.where(d1 == 31, 30, d1)
+    return _thirty360(y1, m1, d1, y2, m2, d2)
+
+
+def _dc30b360(start, end):
+    y1, m1, d1 = _components(start)
+    y2, m2, d2 = _components(end)
+    d1 = np.minimum(d1, 30)
+    d2 = np.where(d1 > 29, np.minimum(d2, 30), d2)
+    return _thirty360(y1, m1, d1, y2, m2, d2)
+
+
+def _dc30e360(start, end):
+    y1, m1, d1 = _components(start)
+    y2, m2, d2 = _components(end)
+    return _thirty360(y1, m1, np.minimum(d1, 30), y2, m2, np.minimum(d2, 30))
+
+
+def _dcactact(start, end):
+    y1 = start.astype('datetime64[Y]').astype(int) + 1970
+    y2 = end.astype('datetime64[Y]').astype(int) + 1970
+    days1 = np.where(isleapyear(y1), 366, 365)
+    days2 = np.where(isleapyear(y2), 366, 365)
+    dec1 = ((y1 - 1969).astype('datetime64[Y]').astype('datetime64[D]') - 1 - start).astype(int) / days1
+    dec2 = (end - (y2 - 1970).astype('datetime64[Y]').astype('datetime64[D]')).astype(int) / days2
+    return np.where(y1 == y2, (end - start).astype(int) / days1, dec1 + dec2 + np.maximum(y2 - y1 - 1, 0))
+
+
+def _dcactual(denominator):
+    return lambda start, end: (end - start).astype(int) / denominator
+
+
+DAYCOUNTMAP = {
+    Convention.DC30360: _dc30360,
+    Convention.DC30U360: _dc30u360,
+    Convention.DC30B360: _dc30b360,
+    Convention.DC30E360: _dc30e360,
+    Convention.DCACTACT: _dcactact,
+    Convention.DCACT365: _dcactual(365),
+    Convention.DCACT364: _dcactual(364),
+    Convention.DCACT360: _dcactual(360)
+}
+
+
+def yearfractions(start, end, convention):
+    convention = v.validate_enum(convention, Convention, 'convention')
+    start, end = np.broadcast_arrays(todays(start), todays(end))
+    return np.asarray(DAYCOUNTMAP[convention](start, end), dtype = float)
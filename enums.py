@@ -29,6 +29,12 @@ class InterpolationType(Enum):
     SPOT = 'Spot Rate'
     DISCOUNT = 'Discount Factor'
     FORWARD = 'Forward Rate'
+    INSTANTANEOUS = 'Instantaneous Forward Rate'
+
+class CurveMethod(Enum):
+    NSS = 'Nelson-Siegel-Svensson'
+    CUBICSPLINE = 'Cubic Spline'
+    MONOTONECUBIC = 'Monotone Cubic'
 
 class Calendar(Enum):
     US = 'SIFMAUS'
@@ -51,4 +57,17 @@ class Convention(Enum):
     DCACTACT = 'Actual/Actual'
     DCACT365 = 'Actual/365'
     DCACT364 = 'Actual/364'
-    DCACT360 = 'Actual/360'
\ No newline at end of file
+    DCACT360 = 'Actual/360'
+
+class BusinessDayConvention(Enum):
+    FOLLOWING = 'Following'
+    MODIFIEDFOLLOWING = 'Modified Following'
+    PRECEDING = 'Preceding'
+
+class EmbeddedOption(Enum):
+    CALLABLE = 'Callable'
+    PUTABLE = 'Putable'
+
+class SwaptionType(Enum):
+    PAYER = 'Payer'
+    RECEIVER = 'Receiver'
@@ -1,8 +1,13 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import pandas_market_calendars as mcal
-from enums import Compounding, Region, Calendar, Currency
+from functools import lru_cache
+import businessdays as bd
+import validation as v
+import daycount as dc
+from daycount import isleapyear
+from enums import Compounding, Region, Calendar, Currency, Frequency, BusinessDayConvention
+from profiling import timed
 
 COMPOUND_MAP = {
     Compounding.WEEKLY: 52,
@@ -13,6 +18,24 @@ COMPOUND_MAP = {
     Compounding.ANNUAL: 1
 }
 
+TENORMAP = {'1m':1/12,'2m':1/6,'3m':0.25,'6m':0.5,'1y':1,'2y':2,'3y':3,'5y':5,'10y':10,'20y':20,'30y':30}
+
+FREQMAP = {'Weekly':52, 'Monthly':12, 'Quarterly':4, 'Semi-Annual':2, 'Annual':1}
+
+class lazyproperty:
+    def __init__(self, function):
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        cache = instance._cache
+        if self.name not in cache:
+            cache[self.name] = self.function(instance)
+        return cache[self.name]
+
 def nelsonsiegelsvensson(time, beta0, beta1, beta2, beta3, lambda0, lambda1):
     t = np.asarray(time, dtype = float)
     with np.errstate(divide = 'ignore', invalid = 'ignore'):
@@ -25,6 +48,21 @@ def nelsonsiegelsvensson(time, beta0, beta1, beta2, beta3, lambda0, lambda1):
     return beta0 + beta1 * term1 + beta2 * term2 + beta3 * term3
 
 
+def nssjacobian(time, beta0, beta1, beta2, beta3, lambda0, lambda1):
+    t = np.asarray(time, dtype = float)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        exp_term0 = np.exp(-t / lambda0)
+        exp_term1 = np.exp(-t / lambda1)
+        term1 = np.where(t == 0, 1, (1 - exp_term0) / (t / lambda0))
+        term2 = term1 - exp_term0
+        term3 = np.where(t == 0, 1, (1 - exp_term1) / (t / lambda1)) - exp_term1
+
+    dlambda0 = (beta1 * term2 + beta2 * (term2 - (t / lambda0) * exp_term0)) / lambda0
+    dlambda1 = beta3 * (term3 - (t / lambda1) * exp_term1) / lambda1
+    return np.stack([np.ones_like(t), term1, term2, term3, dlambda0, dlambda1], axis = -1)
+
+
+@timed
 def discount(time, rate, compounding):
     time = np.asarray(time, dtype = float)
     if compounding == Compounding.CONTINUOUS:
@@ -36,8 +74,10 @@ def discount(time, rate, compounding):
     return (1 + rate / k) ** (-time * k)
     
 
+@timed
 def forward(timeA, rateA, timeB, rateB, compounding):
-    if timeA >= timeB:
+    timeA, rateA, timeB, rateB = [np.asarray(x, dtype = float) for x in (timeA, rateA, timeB, rateB)]
+    if np.any(timeA >= timeB):
         raise ValueError('timeA must be less than timeB')
     
     if compounding == Compounding.CONTINUOUS:
@@ -49,27 +89,66 @@ def forward(timeA, rateA, timeB, rateB, compounding):
     return (k * (((1 + rateB / k) ** timeB) / ((1 + rateA / k) ** timeA)) ** (1 / (timeB - timeA))) - k
 
 
-def dateschedule(start, end, frequency):
-    FREQMAP = {'Weekly':'1W', 'Monthly':'1M', 'Quarterly':'3M', 'Semi-Annual':'6M', 'Annual':'12M'}
-    SETDATE = lambda x, d: (datetime.strptime(x.strftime('%Y-%m') + '-' + str(d.day), '%Y-%m-%d')).date()
-    period = pd.period_range(start, end, freq = FREQMAP.get(frequency, None))
-    period = [SETDATE(x, end) for x in period]
-    period = [pd.to_datetime(x) for x in period if pd.to_datetime(x) >= start]
-    return period
-
-def businessdayadjust(schedule, calendar):
-    cal = mcal.get_calendar(calendar)
-    valid = pd.to_datetime(cal.valid_days(start_date = min(schedule), end_date = max(schedule))).tz_localize(None)
-    return pd.to_datetime([x if x in valid else valid[valid >= x].min().date() for x in schedule])
-
-def isleapyear(year):
-    if (year % 4 == 0):
-        return True
-    elif (year % 100 == 0) and (year % 400 == 0):
-        return True
+def nssmarginal(time, beta0, beta1, beta2, beta3, lambda0, lambda1):
+    t = np.asarray(time, dtype = float)
+    exp_term0 = np.exp(-t / lambda0)
+    exp_term1 = np.exp(-t / lambda1)
+    return beta0 + beta1 * exp_term0 + beta2 * (t / lambda0) * exp_term0 + beta3 * (t / lambda1) * exp_term1
+
+
+def instantaneousforward(rate, marginal, compounding):
+    rate = np.asarray(rate, dtype = float)
+    marginal = np.asarray(marginal, dtype = float)
+    if compounding == Compounding.CONTINUOUS:
+        return marginal
+
+    k = COMPOUND_MAP.get(compounding, None)
+    if k is None:
+        raise ValueError(f'Invalid compounding type: {compounding}')
+    return (k + rate) * np.exp((marginal - rate) / (k + rate)) - k
+
+
+@lru_cache(maxsize = 16384)
+def _dateschedule(start, end, frequency):
+    FREQMAP = {'Monthly':1, 'Quarterly':3, 'Semi-Annual':6, 'Annual':12}
+    if frequency == 'Weekly':
+        dates = end - 7 * np.arange((end - start).astype(int) // 7, -1, -1)
     else:
-        return False
+        step = FREQMAP.get(frequency, None)
+        if step is None:
+            raise ValueError(f'Invalid frequency: {frequency}')
+        endmonth = end.astype('datetime64[M]')
+        months = endmonth - step * np.arange((endmonth - start.astype('datetime64[M]')).astype(int) // step, -1, -1)
+        monthlength = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(int)
+        day = (end - endmonth.astype('datetime64[D]')).astype(int)
+        endofmonth = end == (endmonth + 1).astype('datetime64[D]') - 1
+        dates = months.astype('datetime64[D]') + (monthlength - 1 if endofmonth else np.minimum(day, monthlength - 1))
+    dates = dates[dates >= start]
+    dates.flags.writeable = False
+    return dates
+
+@timed
+def dateschedule(start, end, frequency):
+    frequency = frequency.value if isinstance(frequency, Frequency) else frequency
+    return pd.DatetimeIndex(_dateschedule(np.datetime64(pd.to_datetime(start).date(), 'D'), np.datetime64(pd.to_datetime(end).date(), 'D'), frequency))
+
+@timed
+def businessdayadjust(schedule, calendar, convention = BusinessDayConvention.FOLLOWING):
+    convention = v.validate_enum(convention, BusinessDayConvention, 'convention')
+    schedule = bd.todays(schedule)
+    if not len(schedule):
+        return pd.DatetimeIndex([])
+    index = bd.businessdayindex(calendar, schedule.min(), schedule.max())
+    return pd.DatetimeIndex(index.adjust(schedule, convention))
 
+@timed
+def isbusinessday(dates, calendar):
+    dates = bd.todays(dates)
+    if not len(dates):
+        return np.zeros(0, dtype = bool)
+    return bd.businessdayindex(calendar, dates.min(), dates.max()).isbusinessday(dates)
+
+@timed
 def yearfraction(start, end, convention):
     d1, m1, y1 = [start.day, start.month, start.year]
     d2, m2, y2 = [end.day, end.month, end.year]
@@ -132,5 +211,77 @@ def yearfraction(start, end, convention):
     else:
         raise ValueError(f'Invalid day count convention: {convention}')
     
+@timed
 def datetotime(schedule, start, convention):
-    return [yearfraction(start, d, convention) for d in schedule]
\ No newline at end of file
+    if not len(schedule):
+        return np.zeros(0, dtype = float)
+    return dc.yearfractions(start, schedule, convention)
+
+def _paymentschedules(valuationdate, maturitydates, frequencies, calendar, adjust = True):
+    codes, uniques = pd.factorize(pd.MultiIndex.from_arrays([maturitydates, list(frequencies)]))
+    start = np.datetime64(pd.to_datetime(valuationdate).date(), 'D')
+    schedules = [_dateschedule(start, maturity.to_datetime64().astype('datetime64[D]'), frequency) for maturity, frequency in uniques]
+    counts = np.array([len(dates) for dates in schedules], dtype = int)
+    dates = np.concatenate(schedules) if schedules else np.zeros(0, dtype = 'datetime64[D]')
+    if adjust:
+        dates = np.asarray(businessdayadjust(dates, calendar).values, dtype = 'datetime64[D]')
+    return codes, dates, counts
+
+def _padded(values, counts, fill):
+    starts = np.cumsum(counts) - counts
+    rows = np.repeat(np.arange(len(counts)), counts)
+    padded = np.full((len(counts), max(counts.max(initial = 0), 1)), fill, dtype = values.dtype)
+    padded[rows, np.arange(len(values)) - starts[rows]] = values
+    return padded
+
+@timed
+def paymentdatematrix(valuationdate, maturitydates, frequencies, calendar, adjust = True):
+    codes, dates, counts = _paymentschedules(valuationdate, maturitydates, frequencies, calendar, adjust)
+    return _padded(dates, counts, np.datetime64('NaT'))[codes], counts[codes]
+
+@timed
+def paymenttimematrix(valuationdate, maturitydates, frequencies, conventions, calendar):
+    schedulecodes, dates, schedulecounts = _paymentschedules(valuationdate, maturitydates, frequencies, calendar)
+    codes, uniques = pd.factorize(pd.MultiIndex.from_arrays([schedulecodes, list(conventions)]))
+    starts = np.cumsum(schedulecounts) - schedulecounts
+    counts = np.array([schedulecounts[schedule] for schedule, convention in uniques], dtype = int)
+    index = np.concatenate([starts[schedule] + np.arange(schedulecounts[schedule]) for schedule, convention in uniques]) if len(uniques) else np.zeros(0, dtype = int)
+    conventionlist = np.repeat([convention for schedule, convention in uniques], counts)
+    times = np.empty(len(index), dtype = float)
+    for convention in set(conventionlist):
+        mask = conventionlist == convention
+        times[mask] = datetotime(dates[index[mask]], valuationdate, convention)
+    return _padded(times, counts, 0.0)[codes], counts[codes]
+
+def instrumentlegs(instrument, dates = False):
+    if isinstance(instrument, tuple):
+        if dates:
+            raise ValueError('Invalid instrument: (times, cashflows) tuples carry no payment dates')
+        times, cashflows = [np.atleast_2d(np.asarray(x, dtype = float)) for x in instrument]
+        return {'times': times, 'fixed': cashflows, 'floating': np.zeros(cashflows.shape), 'mask': np.ones(times.shape, dtype = bool)}
+
+    times = np.atleast_2d(np.asarray(instrument.paymenttimes, dtype = float))
+    counts = getattr(instrument, 'paymentcounts', None)
+    mask = np.ones(times.shape, dtype = bool) if counts is None else np.arange(times.shape[1]) < counts[:, None]
+    if hasattr(instrument, 'fixedcashflows'):
+        frequency = np.atleast_1d(np.asarray(instrument.frequency, dtype = object))
+        periods = np.array([FREQMAP.get(f.value, None) for f in frequency], dtype = float)
+        notional = np.atleast_1d(np.asarray(instrument.notional, dtype = float))
+        fixed = np.atleast_2d(np.asarray(instrument.fixedcashflows, dtype = float))
+        floating = np.where(mask, -(notional / periods)[:, None], 0.0)
+    else:
+        fixed = np.atleast_2d(np.asarray(instrument.cashflows, dtype = float))
+        floating = np.zeros(times.shape)
+    legs = {'times': times, 'fixed': fixed, 'floating': floating, 'mask': mask}
+
+    if dates:
+        if counts is None:
+            legs['dates'] = np.asarray(instrument.paymentdates.values, dtype = 'datetime64[D]')[None, :]
+            legs['scheduledates'] = np.asarray(dateschedule(instrument.valuationdate, instrument.maturitydate, instrument.frequency.value).values, dtype = 'datetime64[D]')[None, :]
+            legs['conventions'] = np.full(times.shape, instrument.convention.value, dtype = object)
+        else:
+            frequencies = [f.value for f in instrument.frequency]
+            legs['dates'] = paymentdatematrix(instrument.valuationdate, instrument.maturitydate, frequencies, instrument.calendar.value)[0]
+            legs['scheduledates'] = paymentdatematrix(instrument.valuationdate, instrument.maturitydate, frequencies, instrument.calendar.value, adjust = False)[0]
+            legs['conventions'] = np.broadcast_to(np.array([c.value for c in instrument.convention], dtype = object)[:, None], times.shape)
+    return legs
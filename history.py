@@ -0,0 +1,123 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from scipy import sparse
+import fixedincomeutils as fi
+import daycount as dc
+import validation as v
+import spotsource as ss
+import calibration as cb
+from enums import Compounding, Region
+
+
+class _Flows:
+
+    def __init__(self, instruments):
+        self.labels = []
+        rows, dates, scheduledates, conventions, fixed, floating = [], [], [], [], [], []
+        for i, instrument in enumerate(instruments):
+            name = f'{type(instrument).__name__}{i}'
+            legs = fi.instrumentlegs(instrument, dates = True)
+            d, convention, cf, factor, mask = legs['dates'], legs['conventions'], legs['fixed'], legs['floating'], legs['mask']
+
+            start = len(self.labels)
+            self.labels.extend([name] if len(d) == 1 else [f'{name}[{j}]' for j in range(len(d))])
+            rows.append((start + np.broadcast_to(np.arange(len(d))[:, None], d.shape))[mask])
+            dates.append(d[mask])
+            scheduledates.append(legs['scheduledates'][mask])
+            conventions.append(convention[mask])
+            fixed.append(cf[mask])
+            floating.append(factor[mask])
+
+        rows, dates, scheduledates, conventions, fixed, floating = [np.concatenate(x) for x in (rows, dates, scheduledates, conventions, fixed, floating)]
+        self.size = len(self.labels)
+        self.groups = []
+        columns = np.empty(len(dates), dtype = int)
+        for convention in set(conventions):
+            mask = conventions == convention
+            pairs = np.stack([scheduledates[mask], dates[mask]], axis = 1)
+            uniquepairs, inverse = np.unique(pairs, axis = 0, return_inverse = True)
+            offset = sum(len(group[1]) for group in self.groups)
+            columns[mask] = offset + inverse.ravel()
+            self.groups.append((convention, uniquepairs[:, 1], uniquepairs[:, 0], offset))
+        shape = (self.size, sum(len(group[1]) for group in self.groups))
+        self.fixed = sparse.csr_matrix((fixed, (rows, columns)), shape = shape)
+        self.floating = sparse.csr_matrix((floating, (rows, columns)), shape = shape) if np.any(floating) else None
+
+
+def _revalue(flows, dates, params, compounding):
+    discountfactors = np.zeros((len(dates), flows.fixed.shape[1]))
+    forwards = np.zeros(discountfactors.shape) if flows.floating is not None else None
+    for i, (date, p) in enumerate(zip(dates, params)):
+        for convention, paymentdates, scheduledates, offset in flows.groups:
+            live = np.searchsorted(scheduledates, date, side = 'left')
+            columns = slice(offset + live, offset + len(paymentdates))
+            t = dc.yearfractions(np.atleast_1d(date), paymentdates[live:], convention)
+            rates = fi.nelsonsiegelsvensson(t, *p)
+            discountfactors[i, columns] = fi.discount(t, rates, compounding)
+            if forwards is not None:
+                forwards[i, columns] = fi.forward(t, rates, t + 1, fi.nelsonsiegelsvensson(t + 1, *p), compounding) * discountfactors[i, columns]
+    values = (flows.fixed @ discountfactors.T).T
+    if forwards is not None:
+        values += (flows.floating @ forwards.T).T
+    values[np.isnan(params).any(axis = 1)] = np.nan
+    return values
+
+
+def revaluehistory(instruments, start, end, region = None, compounding = None, source = None, params = None, processes = None, chunksize = 250, path = None):
+    instruments = list(instruments)
+    region = v.validate_enum(region, Region, 'region') if region else instruments[0].region
+    compounding = v.validate_enum(compounding, Compounding, 'compounding') if compounding else instruments[0].compounding
+    for instrument in instruments:
+        if instrument.region != region or instrument.compounding != compounding:
+            raise ValueError(f'Invalid instrument: {instrument!r} does not match region {region.value} and compounding {compounding.value}')
+        if pd.to_datetime(start) < instrument.valuationdate:
+            raise ValueError(f'Invalid start: {pd.to_datetime(start).date()} is before the valuation date {instrument.valuationdate.date()} of {instrument!r}, where its payment schedule begins')
+    flows = _Flows(instruments)
+
+    if params is None:
+        source = source if source else ss.getdefaultsource()
+        if not isinstance(source, ss.LocalSpotStore):
+            raise ValueError(f'Invalid source: {source}. Historical revaluation requires a LocalSpotStore or calibrated params')
+        spots = source.frame(region, start, end)
+        if spots is None or spots.empty:
+            raise ValueError(f'No spot rates for {region.value} between {pd.to_datetime(start).date()} and {pd.to_datetime(end).date()} in {source}')
+        params = cb.calibrate(spots, processes = processes, chunksize = chunksize)
+    params = params.loc[start:end]
+    dates = params.index
+    params = params[cb.NSSPARAMS].to_numpy(dtype = float)
+
+    days = np.asarray(dates.values, dtype = 'datetime64[D]')
+    if path is None:
+        values = np.empty((len(days), flows.size))
+    else:
+        os.makedirs(path, exist_ok = True)
+        np.save(os.path.join(path, 'dates.npy'), days)
+        with open(os.path.join(path, 'labels.json'), 'w') as f:
+            json.dump(flows.labels, f)
+        values = np.lib.format.open_memmap(os.path.join(path, 'values.npy'), mode = 'w+', dtype = float, shape = (len(days), flows.size))
+
+    bounds = list(range(0, len(days), chunksize))
+    chunks = [(days[i:i + chunksize], params[i:i + chunksize]) for i in bounds]
+    if processes is None or processes <= 1 or len(chunks) <= 1:
+        for i, (d, p) in zip(bounds, chunks):
+            values[i:i + len(d)] = _revalue(flows, d, p, compounding)
+    else:
+        with ProcessPoolExecutor(max_workers = processes) as pool:
+            for i, result in zip(bounds, pool.map(_revalue, repeat(flows), *zip(*chunks), repeat(compounding))):
+                values[i:i + len(result)] = result
+
+    if path is None:
+        return pd.DataFrame(values, index = pd.DatetimeIndex(days), columns = flows.labels)
+    values.flush()
+    return loadhistory(path)
+
+
+def loadhistory(path):
+    with open(os.path.join(path, 'labels.json')) as f:
+        labels = json.load(f)
+    dates = pd.DatetimeIndex(np.load(os.path.join(path, 'dates.npy')))
+    return pd.DataFrame(np.load(os.path.join(path, 'values.npy'), mmap_mode = 'r'), index = dates, columns = labels, copy = False)
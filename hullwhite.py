@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import fixedincomeutils as fi
+import validation as v
+from enums import EmbeddedOption, SwaptionType
+from profiling import timed
+
+PATHS = 100000
+CHUNKSIZE = 10000
+PILOTPATHS = 20000
+DEGREE = 3
+
+
+class HullWhite:
+
+    def __init__(self, yieldcurve, meanreversion = 0.03, volatility = 0.01):
+        if meanreversion <= 0 or volatility <= 0:
+            raise ValueError(f'Invalid Hull-White parameters: meanreversion = {meanreversion}, volatility = {volatility}. Both must be positive')
+        self.yieldcurve = yieldcurve
+        self.meanreversion = meanreversion
+        self.volatility = volatility
+
+
+    def __repr__(self):
+        return f'HullWhite(meanreversion = {self.meanreversion}, volatility = {self.volatility}, date = {self.yieldcurve.date.date()}, region = {self.yieldcurve.region.value})'
+
+
+    def discountfactor(self, t):
+        t = np.asarray(t, dtype = float)
+        return np.where(t > 0, self.yieldcurve.interpolate(np.maximum(t, 1e-12), 'Discount Factor'), 1.0)
+
+
+    def _variance(self, tau):
+        a, sigma = self.meanreversion, self.volatility
+        return sigma ** 2 / a ** 2 * (tau + 2 / a * np.exp(-a * tau) - 1 / (2 * a) * np.exp(-2 * a * tau) - 3 / (2 * a))
+
+
+    def bondprice(self, t, T, x):
+        t, T = np.asarray(t, dtype = float), np.asarray(T, dtype = float)
+        B = (1 - np.exp(-self.meanreversion * (T - t))) / self.meanreversion
+        A = self.discountfactor(T) / self.discountfactor(t) * np.exp(0.5 * (self._variance(T - t) - self._variance(T) + self._variance(t)))
+        return A * np.exp(-B * x)
+
+
+    @timed
+    def grid(self, times):
+        times = np.unique(np.concatenate([[0.0], np.asarray(times, dtype = float)]))
+        a, sigma = self.meanreversion, self.volatility
+        dt = np.diff(times)
+        decay = np.exp(-a * dt)
+        xvariance = sigma ** 2 / (2 * a) * (1 - decay ** 2)
+        yvariance = sigma ** 2 / a ** 2 * (dt - 2 * (1 - decay) / a + (1 - decay ** 2) / (2 * a))
+        covariance = sigma ** 2 / (2 * a ** 2) * (1 - decay) ** 2
+        xscale = np.sqrt(xvariance)
+        yscale = np.sqrt(np.maximum(yvariance - covariance ** 2 / xvariance, 0))
+        return {
+            'times': times,
+            'decay': decay,
+            'growth': (1 - decay) / a,
+            'xscale': xscale,
+            'yloading': covariance / xscale,
+            'yscale': yscale,
+            'drift': np.log(self.discountfactor(times)) - 0.5 * self._variance(times)
+        }
+
+
+
+@timed
+def simulate(grid, paths, seed):
+    rng = np.random.default_rng(seed)
+    steps = len(grid['decay'])
+    x = np.zeros((paths, steps + 1))
+    y = np.zeros((paths, steps + 1))
+    for i in range(steps):
+        z = rng.standard_normal((2, paths))
+        x[:, i + 1] = grid['decay'][i] * x[:, i] + grid['xscale'][i] * z[0]
+        y[:, i + 1] = y[:, i] + grid['growth'][i] * x[:, i] + grid['yloading'][i] * z[0] + grid['yscale'][i] * z[1]
+    return x, np.exp(grid['drift'] - y)
+
+
+def _seeds(paths, chunksize, seed):
+    sizes = [min(chunksize, paths - i) for i in range(0, paths, chunksize)]
+    return sizes, np.random.SeedSequence(seed).spawn(len(sizes))
+
+
+def _run(function, paths, chunksize, seed, processes, *args):
+    sizes, seeds = _seeds(paths, chunksize, seed)
+    if processes is None or processes <= 1 or len(sizes) <= 1:
+        results = [function(size, s, *args) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers = processes) as pool:
+            results = list(pool.map(function, sizes, seeds, *[repeat(arg) for arg in args]))
+    total, squares = np.sum([r[0] for r in results], axis = 0), np.sum([r[1] for r in results], axis = 0)
+    mean = total / paths
+    return mean, np.sqrt(np.maximum(squares / paths - mean ** 2, 0) / paths)
+
+
+def _basis(x, degree):
+    return np.vander(x, degree + 1, increasing = True)
+
+
+def _zerocouponchunk(paths, seed, grid):
+    x, deflators = simulate(grid, paths, seed)
+    return deflators[:, 1:].sum(axis = 0), (deflators[:, 1:] ** 2).sum(axis = 0)
+
+
+@timed
+def zerocouponbonds(model, maturities, paths = PATHS, chunksize = CHUNKSIZE, seed = 0, processes = None):
+    maturities = np.atleast_1d(np.asarray(maturities, dtype = float))
+    grid = model.grid(maturities)
+    mean, error = _run(_zerocouponchunk, paths, chunksize, seed, processes, grid)
+    index = np.searchsorted(grid['times'][1:], maturities)
+    return pd.DataFrame({
+        'Maturity': maturities,
+        'Monte Carlo': mean[index],
+        'Standard Error': error[index],
+        'Discount Factor': model.discountfactor(maturities)
+    })
+
+
+def _exercise(option, continuation, strike):
+    return continuation > strike if option == EmbeddedOption.CALLABLE else continuation < strike
+
+
+def _embeddedvalues(x, deflators, columns, cashflows, exercise, strike, option, coefficients = None, degree = DEGREE):
+    values = np.zeros(len(x))
+    fitted = []
+    for j in range(len(columns) - 1, -1, -1):
+        column = columns[j]
+        if exercise[j]:
+            state = x[:, column]
+            continuation = values / deflators[:, column]
+            if coefficients is None:
+                beta = np.linalg.lstsq(_basis(state, degree), continuation, rcond = None)[0]
+                fitted.append(beta)
+            else:
+                beta = coefficients[len(fitted)]
+                fitted.append(beta)
+            exercised = _exercise(option, _basis(state, degree) @ beta, strike)
+            values = np.where(exercised, strike * deflators[:, column], values)
+        values = values + cashflows[j] * deflators[:, column]
+    return values, fitted
+
+
+def _embeddedchunk(paths, seed, grid, columns, cashflows, exercise, strike, option, coefficients, degree):
+    x, deflators = simulate(grid, paths, seed)
+    values, _ = _embeddedvalues(x, deflators, columns, cashflows, exercise, strike, option, coefficients, degree)
+    return values.sum(), (values ** 2).sum()
+
+
+@timed
+def embeddedoptionbond(model, bond, option = EmbeddedOption.CALLABLE, firstexercise = 1.0, strike = None, paths = PATHS, chunksize = CHUNKSIZE, pilotpaths = PILOTPATHS, degree = DEGREE, seed = 0, processes = None):
+    option = v.validate_enum(option, EmbeddedOption, 'option')
+    v.validate_curve(model.yieldcurve, bond.valuationdate, bond.compounding, bond.region, bond.currency, bond.calendar)
+    times = np.asarray(bond.paymenttimes, dtype = float)
+    cashflows = np.asarray(bond.cashflows, dtype = float)
+    strike = bond.facevalue if strike is None else strike
+    exercise = (times >= firstexercise) & (np.arange(len(times)) < len(times) - 1)
+    grid = model.grid(times)
+    columns = np.searchsorted(grid['times'], times)
+
+    pilotseed = np.random.SeedSequence(seed).spawn(1)[0].generate_state(1)[0]
+    x, deflators = simulate(grid, pilotpaths, pilotseed)
+    _, fitted = _embeddedvalues(x, deflators, columns, cashflows, exercise, strike, option, None, degree)
+    price, error = _run(_embeddedchunk, paths, chunksize, seed, processes, grid, columns, cashflows, exercise, strike, option, fitted, degree)
+    straight = cashflows @ model.discountfactor(times)
+    return pd.Series({
+        'Price': price,
+        'Standard Error': error,
+        'Straight Price': straight,
+        'Option Value': straight - price if option == EmbeddedOption.CALLABLE else price - straight,
+        'Exercise Dates': int(exercise.sum()),
+        'Paths': paths
+    }, name = f'{option.value} Bond')
+
+
+def _swaptionchunk(paths, seed, grid, model, expiry, times, fixedcashflows, notional, sign):
+    x, deflators = simulate(grid, paths, seed)
+    state = x[:, -1][:, None]
+    bonds = model.bondprice(expiry, times, state)
+    value = sign * (notional * (1 - bonds[:, -1]) - bonds @ fixedcashflows)
+    payoff = np.maximum(value, 0) * deflators[:, -1]
+    return payoff.sum(), (payoff ** 2).sum()
+
+
+@timed
+def swaption(model, swap, expiry, type = SwaptionType.PAYER, paths = PATHS, chunksize = CHUNKSIZE, seed = 0, processes = None):
+    type = v.validate_enum(type, SwaptionType, 'type')
+    v.validate_curve(model.yieldcurve, swap.valuationdate, swap.compounding, swap.region, swap.currency, swap.calendar)
+    if not isinstance(expiry, (int, float)):
+        expiry = float(fi.datetotime(pd.DatetimeIndex([v.validate_date(expiry, swap.calendar)]), swap.valuationdate, swap.convention.value)[0])
+    times = np.asarray(swap.paymenttimes, dtype = float)
+    if expiry <= 0 or expiry >= times[-1]:
+        raise ValueError(f'Invalid expiry: {expiry:.4f}. Must fall between the valuation date and the final swap payment at {times[-1]:.4f}')
+    resets = np.concatenate([[0.0], times[:-1]])
+    expiry = resets[np.argmin(np.abs(resets - expiry))]
+    if expiry <= 0:
+        raise ValueError(f'Invalid expiry: no swap reset date between the valuation date and the final swap payment at {times[-1]:.4f}')
+    live = times > expiry
+    times, fixedcashflows = times[live], np.asarray(swap.fixedcashflows, dtype = float)[live]
+    sign = 1 if type == SwaptionType.PAYER else -1
+    grid = model.grid([expiry])
+    price, error = _run(_swaptionchunk, paths, chunksize, seed, processes, grid, model, expiry, times, fixedcashflows, swap.notional, sign)
+    return pd.Series({
+        'Price': price,
+        'Standard Error': error,
+        'Expiry': expiry,
+        'Paths': paths
+    }, name = f'{type.value} Swaption')
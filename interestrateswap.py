@@ -1,14 +1,20 @@
+import logging
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from yieldcurve import YieldCurve
+from yieldcurve import getcurve
 from enums import Compounding, Region, Currency, Calendar, Frequency, Convention
 import validation as v
 import fixedincomeutils as fi
+import risk
+from profiling import timed
+
+logger = logging.getLogger(__name__)
 
 class InterestRateSwap:
-    def __init__(self, notional, fixedrate, frequency, maturitydate, valuationdate, compounding, convention, region, currency = None, calendar = None):
+    __slots__ = ('notional', 'fixedrate', 'frequency', 'region', 'currency', 'calendar', 'compounding', 'convention', 'maturitydate', 'valuationdate', 'yieldcurve', '_cache')
+
+    @timed
+    def __init__(self, notional, fixedrate, frequency, maturitydate, valuationdate, compounding, convention, region, currency = None, calendar = None, yieldcurve = None):
         self.notional = notional
         self.fixedrate = fixedrate
         self.frequency = v.validate_enum(frequency, Frequency, 'frequency')
@@ -19,50 +25,74 @@ class InterestRateSwap:
         self.convention = v.validate_enum(convention, Convention, 'convention')
         self.maturitydate = v.validate_date(maturitydate, self.calendar)
         self.valuationdate = v.validate_date(valuationdate, self.calendar)
-        print(self.__repr__())
-        self.paymentdates = self._paymentdates()
-        self.paymenttimes = self._paymenttimes()
-        self.yieldcurve = YieldCurve(self.region, self.valuationdate, self.compounding, self.currency, self.calendar)
-        self.discountfactors = self._discountfactors()
-        self.fixedcashflows = self._fixedcashflows()
-        self.floatingcashflows = self._floatingcashflows()
-        self.fixedprice = self._price('Fixed')
-        self.floatingprice = self._price('Floating')
-        self.npv = self.fixedprice - self.floatingprice
-        self.fixedvaluationtable = self._valuationtable('Fixed')
-        self.floatingvaluationtable = self._valuationtable('Floating')
-        self.fixedduration = self._duration('Fixed')
-        self.floatingduration = self._duration('Floating')
-        self.fixedconvexity = self._convexity('Fixed')
-        self.floatingconvexity = self._convexity('Floating')
+        self.yieldcurve = v.validate_curve(yieldcurve, self.valuationdate, self.compounding, self.region, self.currency, self.calendar) if yieldcurve else getcurve(self.region, self.valuationdate, self.compounding, self.currency, self.calendar)
+        self._cache = {}
+        logger.debug('%r', self)
     
     def __repr__(self):
         return f'InterestRateSwap(notional = {self.notional:,}, fixedrate = {self.fixedrate :.2%}, frequency = {self.frequency.value}, maturitydate = {self.maturitydate.date()}, valuationdate = {self.valuationdate.date()}, region = {self.region.value}, currency = {self.currency.value}, compounding = {self.compounding.value}, calendar = {self.calendar.value}, convention = {self.convention.value})'
     
-    def _paymentdates(self):
+    @fi.lazyproperty
+    @timed
+    def paymentdates(self):
         dates = fi.dateschedule(self.valuationdate, self.maturitydate, self.frequency.value)
         return fi.businessdayadjust(dates, self.calendar.value)
 
-    def _paymenttimes(self):
+    @fi.lazyproperty
+    @timed
+    def paymenttimes(self):
         return fi.datetotime(self.paymentdates, self.valuationdate, self.convention.value)
+
+    @fi.lazyproperty
+    def spotrates(self):
+        return self.yieldcurve.interpolate(self.paymenttimes, 'Spot Rate')
     
-    def _fixedcashflows(self):
-        FREQMAP = {'Weekly':52, 'Monthly':12, 'Quarterly':4, 'Semi-Annual':2, 'Annual':1}
-        return [self.notional * self.fixedrate / FREQMAP.get(self.frequency.value, None)] * len(self.paymentdates)
+    @fi.lazyproperty
+    def tenorrates(self):
+        return self.yieldcurve.interpolate(np.asarray(self.paymenttimes, dtype = float) + 1, 'Spot Rate')
+
+    @fi.lazyproperty
+    @timed
+    def fixedcashflows(self):
+        return np.full(len(self.paymentdates), self.notional * self.fixedrate / fi.FREQMAP.get(self.frequency.value, None), dtype = float)
     
-    def _floatingcashflows(self):
-        FREQMAP = {'Weekly':52, 'Monthly':12, 'Quarterly':4, 'Semi-Annual':2, 'Annual':1}
+    @fi.lazyproperty
+    @timed
+    def floatingcashflows(self):
         rates = self.yieldcurve.interpolate(self.paymenttimes, 'Forward Rate')
-        return self.notional * np.asarray(rates) / FREQMAP.get(self.frequency.value, None)
+        return self.notional * np.asarray(rates) / fi.FREQMAP.get(self.frequency.value, None)
+
+    @fi.lazyproperty
+    @timed
+    def discountfactors(self):
+        return fi.discount(self.paymenttimes, self.spotrates, self.compounding)
+
+    @fi.lazyproperty
+    def fixedprice(self):
+        return self._price('Fixed')
 
-    def _discountfactors(self):
-        return self.yieldcurve.interpolate(self.paymenttimes, 'Discount Factor')
+    @fi.lazyproperty
+    def floatingprice(self):
+        return self._price('Floating')
+
+    @property
+    def npv(self):
+        return self.fixedprice - self.floatingprice
     
+    @timed
     def _price(self, leg):
-        cashflows = np.asarray(self.fixedcashflows, dtype = float) if leg == 'Fixed' else np.asarray(self.floatingcashflows, dtype = float)
-        discountfactors = np.asarray(self.discountfactors, dtype = float)
-        return cashflows @ discountfactors
+        cashflows = self.fixedcashflows if leg == 'Fixed' else self.floatingcashflows
+        return cashflows @ np.asarray(self.discountfactors, dtype = float)
+
+    @fi.lazyproperty
+    def fixedvaluationtable(self):
+        return self._valuationtable('Fixed')
+
+    @fi.lazyproperty
+    def floatingvaluationtable(self):
+        return self._valuationtable('Floating')
     
+    @timed
     def _valuationtable(self, leg):
         return pd.DataFrame({
             'Payment Date': self.paymentdates,
@@ -71,44 +101,57 @@ class InterestRateSwap:
             'Discount Factor': self.discountfactors,
             'Present Value': (self.fixedcashflows if leg == 'Fixed' else self.floatingcashflows) * self.discountfactors
         })
+
+    @fi.lazyproperty
+    def _fixedmeasures(self):
+        return self._riskmeasures('Fixed')
+
+    @fi.lazyproperty
+    def _floatingmeasures(self):
+        return self._riskmeasures('Floating')
     
-    def _duration(self, leg):
-        cashflows = self.fixedcashflows if leg == 'Fixed' else self.floatingcashflows
-        price = self.fixedprice if leg == 'Fixed' else self.floatingprice
-        duration = 0
-        if self.compounding == Compounding.CONTINUOUS:
-            for i, cf in enumerate(cashflows):
-                duration += self.paymenttimes[i] * cf * self.discountfactors(i) / price
-        else:
-            k = fi.COMPOUND_MAP.get(self.compounding, None)
-            rates = self.yieldcurve.interpolate(self.paymenttimes, 'Spot Rate')
-            for i, cf in enumerate(cashflows):
-                duration += ((-self.paymenttimes[i] / k) * cf * (1 + rates[i] / k) ** (-self.paymenttimes[i] - 1)) / price
-        return duration
+    @timed
+    def _riskmeasures(self, leg):
+        if leg == 'Fixed':
+            return risk.riskmeasures(self.paymenttimes, self.fixedcashflows, self.spotrates, self.compounding)
+        return risk.floatingriskmeasures(self.paymenttimes, self.notional / fi.FREQMAP.get(self.frequency.value, None), self.spotrates, self.tenorrates, self.compounding)
+
+    @property
+    def fixedduration(self):
+        return self._fixedmeasures['Modified Duration']
+
+    @property
+    def floatingduration(self):
+        return self._floatingmeasures['Modified Duration']
+
+    @property
+    def fixedconvexity(self):
+        return self._fixedmeasures['Convexity']
+
+    @property
+    def floatingconvexity(self):
+        return self._floatingmeasures['Convexity']
+
+    @property
+    def fixeddv01(self):
+        return self._fixedmeasures['DV01']
+
+    @property
+    def floatingdv01(self):
+        return self._floatingmeasures['DV01']
+
+    @property
+    def dv01(self):
+        return self.fixeddv01 - self.floatingdv01
     
-    def _convexity(self, leg):
-        cashflows = self.fixedcashflows if leg == 'Fixed' else self.floatingcashflows
-        price = self.fixedprice if leg == 'Fixed' else self.floatingprice
-        convexity = 0
-        if self.compounding == Compounding.CONTINUOUS:
-            for i, cf in enumerate(cashflows):
-                convexity += (self.paymenttimes[i] ** 2) * cf * self.discountfactors(i) / price
-        else:
-            k = fi.COMPOUND_MAP.get(self.compounding, None)
-            rates = self.yieldcurve.interpolate(self.paymenttimes, 'Spot Rate')
-            for i, cf in enumerate(cashflows):
-                convexity += ((self.paymenttimes[i] * (self.paymenttimes[i] + 1)) * (1 / k ** 2) * cf * (1 + rates[i] / k) ** (-self.paymenttimes[i] - 2)) / price
-        return convexity
+    @fi.lazyproperty
+    @timed
+    def keyratedurations(self):
+        return pd.DataFrame({
+            'Fixed': risk.keyratedurations(self.paymenttimes, self.fixedcashflows, self.spotrates, self.compounding),
+            'Floating': risk.floatingkeyratedurations(self.paymenttimes, self.notional / fi.FREQMAP.get(self.frequency.value, None), self.spotrates, self.tenorrates, self.compounding)
+        }, index = list(fi.TENORMAP))
     
     def plot(self, type):
-        PLOTSTYLE = {'axes.edgecolor':'#505258', 'grid.linestyle':'dashed', 'grid.color':'white', 'axes.facecolor':'#E8E9EB'}
-        sns.set_style('whitegrid', rc = PLOTSTYLE)
-        plt.figure(figsize = (12,8))
-        sns.barplot(x = self.paymentdates, y = self.fixedvaluationtable[type], color = '#4062BB', label = 'Fixed Leg')
-        sns.barplot(x = self.paymentdates, y = -self.floatingvaluationtable[type], color = '#357266', label = 'Floating Leg')
-        plt.title(f'{self.region.value} Interest Rate Swap {type} ({self.valuationdate.date()})')
-        plt.xlabel('Date')
-        plt.ylabel(type)
-        plt.grid(True, axis = 'y')
-        plt.legend(frameon = False, loc = 'lower center', bbox_to_anchor = (0.5, -0.125), ncol = 2)
-        plt.show()
\ No newline at end of file
+        import plotting
+        return plotting.plotswap(self, type)
@@ -0,0 +1,48 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+import fixedincomeutils as fi
+
+PLOTSTYLE = {'axes.edgecolor':'#505258', 'grid.linestyle':'dashed', 'grid.color':'white', 'axes.facecolor':'#E8E9EB'}
+COLORMAP = {'Spot Rate':'#4062BB','Discount Factor':'#357266','Forward Rate':'#FF495C','Instantaneous Forward Rate':'#F2A541'}
+
+
+def plotcurve(yieldcurve, type):
+    sns.set_style('whitegrid', rc = PLOTSTYLE)
+    ts = yieldcurve.spotrates
+    t = np.linspace(0, max(fi.TENORMAP.values()) if ts is None else np.max(ts['time']), 100)
+    y = yieldcurve.interpolate(t, type)
+    plt.figure(figsize = (12,8))
+    sns.lineplot(x = t, y = y, linestyle = '-', linewidth = 2, color = COLORMAP[type])
+    if ts is not None:
+        ts[type] = yieldcurve.interpolate(ts['time'], type)
+        sns.scatterplot(x = ts['time'], y = ts[type], marker = 'o', s = 75, color = COLORMAP[type]) 
+    plt.title(f'{yieldcurve.region.value} {type} Term Structure ({yieldcurve.date.date()})')
+    plt.xlabel('Maturity')
+    plt.ylabel(type)
+    plt.grid(True, axis = 'y')
+    plt.show()
+
+
+def plotbond(bond, type):
+    sns.set_style('whitegrid', rc = PLOTSTYLE)
+    plt.figure(figsize = (12,8))
+    sns.barplot(x = bond.paymentdates, y = bond.valuationtable[type], color = '#4062BB')
+    plt.title(f'{bond.region.value} Bond {type} ({bond.valuationdate.date()})')
+    plt.xlabel('Date')
+    plt.ylabel(type)
+    plt.grid(True, axis = 'y')
+    plt.show()
+
+
+def plotswap(swap, type):
+    sns.set_style('whitegrid', rc = PLOTSTYLE)
+    plt.figure(figsize = (12,8))
+    sns.barplot(x = swap.paymentdates, y = swap.fixedvaluationtable[type], color = '#4062BB', label = 'Fixed Leg')
+    sns.barplot(x = swap.paymentdates, y = -swap.floatingvaluationtable[type], color = '#357266', label = 'Floating Leg')
+    plt.title(f'{swap.region.value} Interest Rate Swap {type} ({swap.valuationdate.date()})')
+    plt.xlabel('Date')
+    plt.ylabel(type)
+    plt.grid(True, axis = 'y')
+    plt.legend(frameon = False, loc = 'lower center', bbox_to_anchor = (0.5, -0.125), ncol = 2)
+    plt.show()
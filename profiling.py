@@ -0,0 +1,115 @@
+import os
+import json
+import threading
+import pandas as pd
+from time import perf_counter_ns
+from functools import wraps
+from contextlib import contextmanager
+
+_PROFILER = None
+_LOCK = threading.Lock()
+
+
+class Profiler:
+
+    def __init__(self, trace = False):
+        self.trace = trace
+        self.stats = {}
+        self.events = []
+        self.origin = perf_counter_ns()
+        self._lock = threading.Lock()
+
+
+    def __repr__(self):
+        return f'Profiler(stages = {len(self.stats)}, calls = {sum(s[0] for s in self.stats.values()):,}, trace = {self.trace})'
+
+
+    def record(self, name, start, end):
+        elapsed = end - start
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                self.stats[name] = [1, elapsed, elapsed, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] = min(stats[2], elapsed)
+                stats[3] = max(stats[3], elapsed)
+            if self.trace:
+                self.events.append((name, start, elapsed, threading.get_ident()))
+
+
+    def clear(self):
+        with self._lock:
+            self.stats.clear()
+            self.events.clear()
+            self.origin = perf_counter_ns()
+
+
+    def todict(self):
+        return {name: {'Calls': calls, 'Total (s)': total / 1e9, 'Mean (s)': total / calls / 1e9, 'Min (s)': low / 1e9, 'Max (s)': high / 1e9} for name, (calls, total, low, high) in self.stats.items()}
+
+
+    def toframe(self):
+        frame = pd.DataFrame.from_dict(self.todict(), orient = 'index', columns = ['Calls', 'Total (s)', 'Mean (s)', 'Min (s)', 'Max (s)'])
+        return frame.sort_values('Total (s)', ascending = False)
+
+
+    def tochrometrace(self, path = None):
+        trace = {'traceEvents': [
+            {'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'ts': (start - self.origin) / 1e3, 'dur': elapsed / 1e3, 'pid': os.getpid(), 'tid': tid}
+            for name, start, elapsed, tid in self.events
+        ], 'displayTimeUnit': 'ms'}
+        if path is not None:
+            with open(path, 'w') as f:
+                json.dump(trace, f)
+        return trace
+
+
+
+def getprofiler():
+    return _PROFILER
+
+
+@contextmanager
+def profile(profiler = None, trace = False):
+    global _PROFILER
+    profiler = profiler if profiler is not None else Profiler(trace)
+    with _LOCK:
+        previous, _PROFILER = _PROFILER, profiler
+    try:
+        yield profiler
+    finally:
+        with _LOCK:
+            _PROFILER = previous
+
+
+@contextmanager
+def stage(name):
+    profiler = _PROFILER
+    if profiler is None:
+        yield
+        return
+    start = perf_counter_ns()
+    try:
+        yield
+    finally:
+        profiler.record(name, start, perf_counter_ns())
+
+
+def timed(function = None, name = None):
+    def decorator(function):
+        label = name if name else f'{function.__module__}.{function.__qualname__}'
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _PROFILER
+            if profiler is None:
+                return function(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.record(label, start, perf_counter_ns())
+        return wrapper
+    return decorator(function) if function is not None else decorator
@@ -0,0 +1,97 @@
+import numpy as np
+import fixedincomeutils as fi
+from enums import Compounding
+from profiling import timed
+
+PILLARS = np.array(list(fi.TENORMAP.values()), dtype = float)
+BASISPOINT = 1e-4
+
+
+def sensitivities(times, rates, compounding):
+    if compounding == Compounding.CONTINUOUS:
+        return times, times ** 2
+    k = fi.COMPOUND_MAP.get(compounding, None)
+    if k is None:
+        raise ValueError(f'Invalid compounding type: {compounding}')
+    growth = 1 + rates / k
+    return times / growth, times * (times + 1 / k) / growth ** 2
+
+
+@timed
+def riskmeasures(times, cashflows, rates, compounding):
+    times, cashflows, rates = np.broadcast_arrays(*[np.asarray(x, dtype = float) for x in (times, cashflows, rates)])
+    presentvalues = cashflows * fi.discount(times, rates, compounding)
+    first, second = sensitivities(times, rates, compounding)
+    price = presentvalues.sum(axis = -1)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        modified = (first * presentvalues).sum(axis = -1) / price
+        return {
+            'Price': price,
+            'Macaulay Duration': (times * presentvalues).sum(axis = -1) / price,
+            'Modified Duration': modified,
+            'Convexity': (second * presentvalues).sum(axis = -1) / price,
+            'DV01': modified * price * BASISPOINT
+        }
+
+
+def floatingpresentvalues(times, factors, rates, tenorrates, compounding, tenor = 1):
+    forwards = fi.forward(times, rates, times + tenor, tenorrates, compounding)
+    return factors * forwards * fi.discount(times, rates, compounding)
+
+
+@timed
+def floatingriskmeasures(times, factors, rates, tenorrates, compounding, tenor = 1):
+    times, factors, rates, tenorrates = np.broadcast_arrays(*[np.asarray(x, dtype = float) for x in (times, factors, rates, tenorrates)])
+    presentvalues = floatingpresentvalues(times, factors, rates, tenorrates, compounding, tenor)
+    up = floatingpresentvalues(times, factors, rates + BASISPOINT, tenorrates + BASISPOINT, compounding, tenor).sum(axis = -1)
+    down = floatingpresentvalues(times, factors, rates - BASISPOINT, tenorrates - BASISPOINT, compounding, tenor).sum(axis = -1)
+    price = presentvalues.sum(axis = -1)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return {
+            'Price': price,
+            'Macaulay Duration': (times * presentvalues).sum(axis = -1) / price,
+            'Modified Duration': (down - up) / (2 * BASISPOINT * price),
+            'Convexity': (up + down - 2 * price) / (BASISPOINT ** 2 * price),
+            'DV01': (down - up) / 2
+        }
+
+
+def pillarindex(times, pillars = PILLARS):
+    t = np.clip(times, pillars[0], pillars[-1])
+    left = np.clip(np.searchsorted(pillars, t, side = 'right') - 1, 0, len(pillars) - 2)
+    return left, (t - pillars[left]) / (pillars[left + 1] - pillars[left])
+
+
+def pillarweights(times, pillars = PILLARS):
+    times = np.asarray(times, dtype = float)
+    left, weight = pillarindex(times, pillars)
+    weights = np.zeros(times.shape + (len(pillars),))
+    np.put_along_axis(weights, left[..., None], (1 - weight)[..., None], axis = -1)
+    np.put_along_axis(weights, left[..., None] + 1, weight[..., None], axis = -1)
+    return weights
+
+
+@timed
+def keyratedurations(times, cashflows, rates, compounding, pillars = PILLARS):
+    times, cashflows, rates = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype = float)) for x in (times, cashflows, rates)])
+    presentvalues = cashflows * fi.discount(times, rates, compounding)
+    exposure = (sensitivities(times, rates, compounding)[0] * presentvalues).reshape(-1, times.shape[-1])
+
+    left, weight = pillarindex(times.reshape(exposure.shape), pillars)
+    rows = np.arange(len(exposure))[:, None] * len(pillars)
+    size = len(exposure) * len(pillars)
+    buckets = np.bincount((rows + left).ravel(), ((1 - weight) * exposure).ravel(), minlength = size) + np.bincount((rows + left + 1).ravel(), (weight * exposure).ravel(), minlength = size)
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return (buckets.reshape(exposure.shape[0], len(pillars)) / presentvalues.reshape(exposure.shape).sum(axis = -1, keepdims = True)).reshape(times.shape[:-1] + (len(pillars),))
+
+
+@timed
+def floatingkeyratedurations(times, factors, rates, tenorrates, compounding, tenor = 1, pillars = PILLARS):
+    times, factors, rates, tenorrates = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype = float)) for x in (times, factors, rates, tenorrates)])
+    shifts = pillarweights(times, pillars) * BASISPOINT
+    tenorshifts = pillarweights(times + tenor, pillars) * BASISPOINT
+    value = lambda sign: floatingpresentvalues(times[..., None], factors[..., None], rates[..., None] + sign * shifts, tenorrates[..., None] + sign * tenorshifts, compounding, tenor).sum(axis = -2)
+    price = floatingpresentvalues(times, factors, rates, tenorrates, compounding, tenor).sum(axis = -1)
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return (value(-1) - value(1)) / (2 * BASISPOINT * price[..., None])
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+import fixedincomeutils as fi
+import risk
+
+
+def parallelshifts(shifts, grid):
+    return np.asarray(shifts, dtype = float)[:, None] + np.zeros_like(np.asarray(grid, dtype = float))
+
+
+def twists(shortshifts, longshifts, grid, pivot = risk.PILLARS[-1]):
+    weight = np.clip(np.asarray(grid, dtype = float) / pivot, 0, 1)
+    return np.asarray(shortshifts, dtype = float)[:, None] * (1 - weight) + np.asarray(longshifts, dtype = float)[:, None] * weight
+
+
+def nssshifts(perturbations, nssparams, grid):
+    params = np.asarray(nssparams, dtype = float) + np.asarray(perturbations, dtype = float)
+    grid = np.asarray(grid, dtype = float)
+    return fi.nelsonsiegelsvensson(grid, *params.T[:, :, None]) - fi.nelsonsiegelsvensson(grid, *nssparams)
+
+
+def historicalshifts(changes, grid, pillars = risk.PILLARS):
+    return np.asarray(changes, dtype = float) @ risk.pillarweights(grid, pillars).T
+
+
+def historicalchanges(frame, horizon = 1):
+    frame = frame[[t for t in fi.TENORMAP if t in frame.columns]]
+    pillars = np.array([fi.TENORMAP[t] for t in frame.columns], dtype = float)
+    changes = frame.diff(horizon).iloc[horizon:]
+    changes = changes[changes.notna().any(axis = 1)]
+    values = changes.to_numpy(dtype = float, copy = True)
+    missing = np.isnan(values)
+    for i in np.flatnonzero(missing.any(axis = 1)):
+        known = ~missing[i]
+        values[i, missing[i]] = np.interp(pillars[missing[i]], pillars[known], values[i, known])
+    return pillars, pd.DataFrame(values, index = changes.index, columns = changes.columns)
+
+
+def valueatrisk(pnl, level = 0.99):
+    return -np.quantile(pnl, 1 - level, axis = 0)
+
+
+def expectedshortfall(pnl, level = 0.99):
+    pnl = np.asarray(pnl, dtype = float)
+    tail = pnl <= -valueatrisk(pnl, level)
+    return -(pnl * tail).sum(axis = 0) / tail.sum(axis = 0)
+
+
+
+class ScenarioEngine:
+
+    def __init__(self, yieldcurve, instruments, grid = None):
+        self.yieldcurve = yieldcurve
+        self.size, rows, times, fixed, floating = self._cashflows(instruments)
+        self.floatingtimes, floatingcolumns = np.unique(times[floating != 0], return_inverse = True)
+        self.tenortimes = self.floatingtimes + 1
+        self.grid, self.cashflowmatrix = self._cashflowmatrix(rows[fixed != 0], times[fixed != 0], fixed[fixed != 0], grid)
+        self.spotrates = yieldcurve.interpolate(self.grid, 'Spot Rate')
+        self.discountfactors = fi.discount(self.grid, self.spotrates, yieldcurve.compounding)
+        self.floatingmatrix = sparse.csr_matrix((floating[floating != 0], (rows[floating != 0], floatingcolumns)), shape = (self.size, len(self.floatingtimes)))
+        if len(self.floatingtimes):
+            self.floatingweights, self.tenorweights = self._weights(self.floatingtimes), self._weights(self.tenortimes)
+            self.floatingrates = yieldcurve.interpolate(self.floatingtimes, 'Spot Rate')
+            self.tenorrates = yieldcurve.interpolate(self.tenortimes, 'Spot Rate')
+        self.basevalues = self.cashflowmatrix @ self.discountfactors + self.floatingmatrix @ self.scenariofloatingvalues(np.zeros((1, len(self.grid))))[0]
+
+
+    def __repr__(self):
+        return f'ScenarioEngine(instruments = {self.size:,}, grid = {len(self.grid):,}, date = {self.yieldcurve.date.date()})'
+
+
+    def _cashflows(self, instruments):
+        count, rows, times, fixed, floating = 0, [], [], [], []
+        for instrument in instruments:
+            legs = fi.instrumentlegs(instrument)
+            t, mask = legs['times'], legs['mask']
+            rows.append(np.broadcast_to(count + np.arange(len(t))[:, None], t.shape)[mask])
+            count += len(t)
+            times.append(t[mask])
+            fixed.append(legs['fixed'][mask])
+            floating.append(legs['floating'][mask])
+        return (count, *[np.concatenate(x) for x in (rows, times, fixed, floating)])
+
+
+    def _cashflowmatrix(self, rows, times, cashflows, grid):
+        if grid is None:
+            grid = np.unique(np.concatenate([times, self.floatingtimes, self.tenortimes]))
+            return grid, sparse.csr_matrix((cashflows, (rows, np.searchsorted(grid, times))), shape = (self.size, len(grid)))
+        grid = np.asarray(grid, dtype = float)
+        left, weight = risk.pillarindex(times, grid)
+        matrix = np.zeros((self.size, len(grid)))
+        np.add.at(matrix, (rows, left), (1 - weight) * cashflows)
+        np.add.at(matrix, (rows, left + 1), weight * cashflows)
+        return grid, matrix
+
+
+    def _weights(self, times):
+        left, weight = risk.pillarindex(times, self.grid)
+        rows = np.arange(len(times))
+        return sparse.csr_matrix((np.concatenate([1 - weight, weight]), (np.concatenate([rows, rows]), np.concatenate([left, left + 1]))), shape = (len(times), len(self.grid)))
+
+
+    def scenariodiscountfactors(self, shifts):
+        return fi.discount(self.grid, self.spotrates + shifts, self.yieldcurve.compounding)
+
+
+    def scenariofloatingvalues(self, shifts):
+        shifts = np.atleast_2d(shifts)
+        if not len(self.floatingtimes):
+            return np.zeros((len(shifts), 0))
+        rates = self.floatingrates + (self.floatingweights @ shifts.T).T
+        tenorrates = self.tenorrates + (self.tenorweights @ shifts.T).T
+        return risk.floatingpresentvalues(self.floatingtimes, 1.0, rates, tenorrates, self.yieldcurve.compounding)
+
+
+    def pnl(self, shifts, chunksize = 1000):
+        shifts = np.atleast_2d(shifts)
+        pnl = np.empty((len(shifts), self.size))
+        for i in range(0, len(shifts), chunksize):
+            chunk = shifts[i:i + chunksize]
+            pnl[i:i + chunksize] = (self.cashflowmatrix @ self.scenariodiscountfactors(chunk).T + self.floatingmatrix @ self.scenariofloatingvalues(chunk).T).T - self.basevalues
+        return pnl
+
+
+    def portfoliopnl(self, shifts, positions = None, chunksize = 1000):
+        shifts = np.atleast_2d(shifts)
+        positions = np.ones(self.size) if positions is None else np.asarray(positions, dtype = float)
+        exposure = self.cashflowmatrix.T @ positions
+        floatingexposure = self.floatingmatrix.T @ positions
+        pnl = np.empty(len(shifts))
+        for i in range(0, len(shifts), chunksize):
+            chunk = shifts[i:i + chunksize]
+            pnl[i:i + chunksize] = self.scenariodiscountfactors(chunk) @ exposure + self.scenariofloatingvalues(chunk) @ floatingexposure
+        return pnl - self.basevalues @ positions
+
+
+    def report(self, shifts, positions = None, level = 0.99, chunksize = 1000):
+        pnl = self.portfoliopnl(shifts, positions, chunksize)
+        return pd.Series({
+            'Scenarios': len(pnl),
+            'Mean P&L': pnl.mean(),
+            'Worst P&L': pnl.min(),
+            f'VaR ({level:.0%})': valueatrisk(pnl, level),
+            f'Expected Shortfall ({level:.0%})': expectedshortfall(pnl, level)
+        })
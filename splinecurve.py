@@ -0,0 +1,108 @@
+import numpy as np
+from enums import CurveMethod
+from profiling import timed
+
+
+def _naturalslopes(x, y):
+    h = np.diff(x)
+    delta = np.diff(y) / h
+    n = len(x)
+    second = np.zeros(n)
+    if n > 2:
+        system = np.diag(2 * (h[:-1] + h[1:])) + np.diag(h[1:-1], 1) + np.diag(h[1:-1], -1)
+        second[1:-1] = np.linalg.solve(system, 6 * np.diff(delta))
+    slopes = np.empty(n)
+    slopes[:-1] = delta - h * (2 * second[:-1] + second[1:]) / 6
+    slopes[-1] = delta[-1] + h[-1] * (second[-2] + 2 * second[-1]) / 6
+    return slopes
+
+
+def _endslope(h0, h1, delta0, delta1):
+    slope = ((2 * h0 + h1) * delta0 - h0 * delta1) / (h0 + h1)
+    if np.sign(slope) != np.sign(delta0):
+        return 0.0
+    if np.sign(delta0) != np.sign(delta1) and abs(slope) > abs(3 * delta0):
+        return 3 * delta0
+    return slope
+
+
+def _monotoneslopes(x, y):
+    h = np.diff(x)
+    delta = np.diff(y) / h
+    slopes = np.zeros(len(x))
+    if len(x) == 2:
+        slopes[:] = delta[0]
+        return slopes
+    w1, w2 = 2 * h[1:] + h[:-1], h[1:] + 2 * h[:-1]
+    same = np.sign(delta[:-1]) * np.sign(delta[1:]) > 0
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        slopes[1:-1] = np.where(same, (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:]), 0.0)
+    slopes[0] = _endslope(h[0], h[1], delta[0], delta[1])
+    slopes[-1] = _endslope(h[-1], h[-2], delta[-1], delta[-2])
+    return slopes
+
+
+SLOPES = {
+    CurveMethod.CUBICSPLINE: _naturalslopes,
+    CurveMethod.MONOTONECUBIC: _monotoneslopes
+}
+
+
+class SplineCurve:
+    __slots__ = ('method', 'knots', 'breaks', 'coefficients')
+
+    @timed
+    def __init__(self, time, spot, method = CurveMethod.CUBICSPLINE):
+        time, spot = np.asarray(time, dtype = float), np.asarray(spot, dtype = float)
+        mask = np.isfinite(time) & np.isfinite(spot)
+        order = np.argsort(time[mask])
+        x, y = time[mask][order], spot[mask][order]
+        if len(x) < 2 or np.any(np.diff(x) <= 0):
+            raise ValueError(f'Invalid pillars: need at least two distinct finite times, got {len(x)}')
+        if method not in SLOPES:
+            raise ValueError(f'Invalid spline method: {method}. Choose from {", ".join(m.value for m in SLOPES)}')
+
+        h = np.diff(x)
+        delta = np.diff(y) / h
+        slopes = SLOPES[method](x, y)
+        self.method = method
+        self.knots = x
+        self.breaks = x[1:-1].copy()
+        self.coefficients = np.vstack([
+            y[:-1],
+            slopes[:-1],
+            (3 * delta - 2 * slopes[:-1] - slopes[1:]) / h,
+            (slopes[:-1] + slopes[1:] - 2 * delta) / h ** 2
+        ])
+
+
+    def __repr__(self):
+        return f'SplineCurve(method = {self.method.value}, pillars = {len(self.knots)}, start = {self.knots[0]:.4f}, end = {self.knots[-1]:.4f})'
+
+
+    def _locate(self, t):
+        t = np.asarray(t, dtype = float)
+        index = np.searchsorted(self.breaks, t, side = 'right')
+        clipped = np.clip(t, self.knots[0], self.knots[-1])
+        return t, clipped, clipped - self.knots.take(index), index
+
+
+    def __call__(self, t):
+        t, clipped, dx, index = self._locate(t)
+        a, b, c, d = self.coefficients
+        return a.take(index) + dx * (b.take(index) + dx * (c.take(index) + dx * d.take(index)))
+
+
+    def derivative(self, t):
+        t, clipped, dx, index = self._locate(t)
+        a, b, c, d = self.coefficients
+        slope = b.take(index) + dx * (2 * c.take(index) + dx * 3 * d.take(index))
+        return np.where(clipped == t, slope, 0.0)
+
+
+    def marginal(self, t):
+        t, clipped, dx, index = self._locate(t)
+        a, b, c, d = (x.take(index) for x in self.coefficients)
+        spot = a + dx * (b + dx * (c + dx * d))
+        slope = b + dx * (2 * c + dx * 3 * d)
+        return spot + t * np.where(clipped == t, slope, 0.0)
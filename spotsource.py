@@ -0,0 +1,165 @@
+import os
+import json
+import warnings
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+import validation as v
+import fixedincomeutils as fi
+from enums import Region
+
+
+def spotframe(tenors, spots):
+    ts = pd.DataFrame({'tenor': tenors, 'spot': spots})
+    ts['time'] = ts['tenor'].map(fi.TENORMAP)
+    return ts[['tenor','time','spot']].dropna().reset_index(drop = True)
+
+
+
+class SpotSource(ABC):
+
+    @abstractmethod
+    def load(self, region, date):
+        pass
+
+
+
+class TreasurySource(SpotSource):
+
+    def __repr__(self):
+        return 'TreasurySource()'
+
+
+    def load(self, region, date):
+        if region != Region.US:
+            return None
+        import ustreasurycurve as ustc
+        warnings.simplefilter('ignore', category = UserWarning)
+        ts = ustc.nominalRates(date_start = date, date_end = date)
+        warnings.simplefilter('default', category = UserWarning)
+        ts = ts.iloc[:,1:].melt(var_name = 'tenor', value_name = 'spot')
+        return spotframe(ts['tenor'], ts['spot'])
+
+
+
+class SyntheticSource(SpotSource):
+
+    def __init__(self, nssparams = (0.045, 0.01, -0.01, 0.005, 1.5, 10.0), amplitude = 0.005):
+        self.nssparams = tuple(nssparams)
+        self.amplitude = amplitude
+
+
+    def __repr__(self):
+        return f'SyntheticSource(nssparams = {self.nssparams}, amplitude = {self.amplitude})'
+
+
+    def __eq__(self, other):
+        return isinstance(other, SyntheticSource) and (self.nssparams, self.amplitude) == (other.nssparams, other.amplitude)
+
+
+    def __hash__(self):
+        return hash((SyntheticSource, self.nssparams, self.amplitude))
+
+
+    def load(self, region, date):
+        time = np.array(list(fi.TENORMAP.values()), dtype = float)
+        shift = self.amplitude * np.sin(pd.to_datetime(date).toordinal() / 365.25 * 2 * np.pi)
+        return spotframe(list(fi.TENORMAP), fi.nelsonsiegelsvensson(time, *self.nssparams) + shift)
+
+
+
+class LocalSpotStore(SpotSource):
+
+    def __init__(self, path):
+        self.path = path
+        self._regions = {}
+
+
+    def __repr__(self):
+        return f'LocalSpotStore(path = {self.path})'
+
+
+    def _directory(self, region):
+        return os.path.join(self.path, region.name)
+
+
+    def _open(self, region):
+        region = v.validate_enum(region, Region, 'region')
+        if region not in self._regions:
+            directory = self._directory(region)
+            if not os.path.exists(os.path.join(directory, 'spots.npy')):
+                return None
+            with open(os.path.join(directory, 'tenors.json')) as f:
+                tenors = json.load(f)
+            dates = np.load(os.path.join(directory, 'dates.npy'))
+            spots = np.load(os.path.join(directory, 'spots.npy'), mmap_mode = 'r')
+            index = dict(zip(dates.astype('int64').tolist(), range(len(dates))))
+            self._regions[region] = (index, dates, tenors, spots)
+        return self._regions[region]
+
+
+    def ingest(self, data, region, datecolumn = 'date'):
+        region = v.validate_enum(region, Region, 'region')
+        data = pd.read_csv(data) if isinstance(data, (str, os.PathLike)) else data.copy()
+        if datecolumn in data.columns:
+            data = data.set_index(datecolumn)
+        elif not isinstance(data.index, pd.DatetimeIndex):
+            raise ValueError(f'Invalid datecolumn: {datecolumn} is not in the columns ({", ".join(map(str, data.columns))}) and the index is not dates')
+        if {'tenor', 'spot'}.issubset(data.columns):
+            data = data.pivot_table(index = data.index, columns = 'tenor', values = 'spot', aggfunc = 'last')
+        data = data[[t for t in data.columns if t in fi.TENORMAP]]
+        if data.columns.empty:
+            raise ValueError(f'No valid tenors to ingest. Choose from {", ".join(fi.TENORMAP)}')
+        data.index = pd.to_datetime(data.index).normalize()
+
+        existing = self.frame(region)
+        if existing is not None:
+            data = data.combine_first(existing)
+        data = data.groupby(level = 0).last().sort_index()
+        tenors = sorted(data.columns, key = fi.TENORMAP.get)
+
+        directory = self._directory(region)
+        os.makedirs(directory, exist_ok = True)
+        self._regions.pop(region, None)
+        np.save(os.path.join(directory, 'dates.npy'), data.index.values.astype('datetime64[D]'))
+        np.save(os.path.join(directory, 'spots.npy'), data[tenors].to_numpy(dtype = float))
+        with open(os.path.join(directory, 'tenors.json'), 'w') as f:
+            json.dump(tenors, f)
+        return len(data)
+
+
+    def load(self, region, date):
+        store = self._open(region)
+        if store is None:
+            return None
+        index, dates, tenors, spots = store
+        row = index.get(np.datetime64(pd.to_datetime(date).date(), 'D').astype('int64'))
+        if row is None:
+            return None
+        return spotframe(tenors, spots[row])
+
+
+    def dates(self, region):
+        store = self._open(region)
+        return pd.DatetimeIndex([]) if store is None else pd.DatetimeIndex(store[1])
+
+
+    def frame(self, region, start = None, end = None):
+        store = self._open(region)
+        if store is None:
+            return None
+        index, dates, tenors, spots = store
+        frame = pd.DataFrame(np.array(spots), index = pd.DatetimeIndex(dates), columns = tenors)
+        return frame.loc[start:end]
+
+
+
+DEFAULTSOURCE = TreasurySource()
+
+def getdefaultsource():
+    return DEFAULTSOURCE
+
+def setdefaultsource(source):
+    global DEFAULTSOURCE
+    DEFAULTSOURCE = source
+    return source
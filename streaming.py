@@ -0,0 +1,92 @@
+import copy
+import asyncio
+import numpy as np
+import pandas as pd
+import fixedincomeutils as fi
+import risk
+
+
+class StreamingPricer:
+
+    def __init__(self, yieldcurve):
+        self.yieldcurve = copy.copy(yieldcurve)
+        self.labels = []
+        self._rows, self._times, self._fixed, self._floating = [], [], [], []
+        self._grid = None
+        self.prices = None
+        self.dv01 = None
+
+
+    def __repr__(self):
+        return f'StreamingPricer(instruments = {len(self.labels):,}, date = {self.yieldcurve.date.date()}, region = {self.yieldcurve.region.value})'
+
+
+    def __len__(self):
+        return len(self.labels)
+
+
+    def register(self, instrument, name = None):
+        name = f'{type(instrument).__name__}{len(self.labels)}' if name is None else name
+        legs = fi.instrumentlegs(instrument)
+        t, fixed, floating, mask = legs['times'], legs['fixed'], legs['floating'], legs['mask']
+        start = len(self.labels)
+        self.labels.extend([name] if len(t) == 1 else [f'{name}[{i}]' for i in range(len(t))])
+        self._rows.append((start + np.broadcast_to(np.arange(len(t))[:, None], t.shape))[mask])
+        self._times.append(t[mask])
+        self._fixed.append(fixed[mask])
+        self._floating.append(floating[mask])
+        self._grid = None
+        self.prices = self.dv01 = None
+        return slice(start, len(self.labels))
+
+
+    def _build(self):
+        self.rows, self.times, self.fixed, self.floating = [np.concatenate(x) for x in (self._rows, self._times, self._fixed, self._floating)]
+        self._grid, self._inverse = np.unique(self.times, return_inverse = True)
+        self._rows, self._times, self._fixed, self._floating = [self.rows], [self.times], [self.fixed], [self.floating]
+
+
+    def reprice(self):
+        if self._grid is None:
+            self._build()
+        grid, inverse, times = self._grid, self._inverse, self.times
+        compounding = self.yieldcurve.compounding
+        spotrates = self.yieldcurve.interpolate(grid, 'Spot Rate')[inverse]
+        presentvalues = self.fixed * fi.discount(times, spotrates, compounding)
+        sensitivities = risk.sensitivities(times, spotrates, compounding)[0] * presentvalues * risk.BASISPOINT
+        if np.any(self.floating):
+            tenorrates = self.yieldcurve.interpolate(grid + 1, 'Spot Rate')[inverse]
+            presentvalues = presentvalues + risk.floatingpresentvalues(times, self.floating, spotrates, tenorrates, compounding)
+            up = risk.floatingpresentvalues(times, self.floating, spotrates + risk.BASISPOINT, tenorrates + risk.BASISPOINT, compounding)
+            down = risk.floatingpresentvalues(times, self.floating, spotrates - risk.BASISPOINT, tenorrates - risk.BASISPOINT, compounding)
+            sensitivities = sensitivities + (down - up) / 2
+        prices = np.bincount(self.rows, presentvalues, minlength = len(self.labels))
+        dv01 = np.bincount(self.rows, sensitivities, minlength = len(self.labels))
+
+        previousprices = prices if self.prices is None else self.prices
+        previousdv01 = dv01 if self.dv01 is None else self.dv01
+        self.prices, self.dv01 = prices, dv01
+        return pd.DataFrame({
+            'Price': prices,
+            'Price Change': prices - previousprices,
+            'DV01': dv01,
+            'DV01 Change': dv01 - previousdv01
+        }, index = self.labels)
+
+
+    def update(self, spots):
+        if self.prices is None:
+            self.reprice()
+        self.yieldcurve.update(spots)
+        return self.reprice()
+
+
+    def stream(self, updates):
+        for spots in updates:
+            yield self.update(spots)
+
+
+    async def astream(self, updates):
+        loop = asyncio.get_running_loop()
+        async for spots in updates:
+            yield await loop.run_in_executor(None, self.update, spots)
@@ -0,0 +1,105 @@
+import logging
+import pandas as pd
+import numpy as np
+from yieldcurve import getcurve
+from enums import Compounding, Region, Currency, Calendar, Frequency, Convention
+import validation as v
+import fixedincomeutils as fi
+import risk
+
+logger = logging.getLogger(__name__)
+
+class SwapBook:
+    def __init__(self, notional, fixedrate, frequency, maturitydate, valuationdate, compounding, convention, region, currency = None, calendar = None, yieldcurve = None):
+        columns = np.broadcast_arrays(*[np.atleast_1d(np.asarray(x, dtype = object)) for x in (notional, fixedrate, frequency, maturitydate, convention)])
+        self.region = v.validate_enum(region, Region, 'region')
+        self.currency = v.validate_enum(currency, Currency, 'currency') if currency else v.default_currency(self.region)
+        self.calendar = v.validate_enum(calendar, Calendar, 'calendar') if calendar else v.default_calendar(self.region)
+        self.compounding = v.validate_enum(compounding, Compounding, 'compounding')
+        self.valuationdate = v.validate_date(valuationdate, self.calendar)
+        self.notional = columns[0].astype(float)
+        self.fixedrate = columns[1].astype(float)
+        self.frequency = v.validate_enum_column(columns[2], Frequency, 'frequency')
+        self.convention = v.validate_enum_column(columns[4], Convention, 'convention')
+        self.maturitydate = v.validate_date_column(columns[3], self.calendar)
+        logger.debug('%r', self)
+        self.periods = self._periods()
+        self.paymenttimes, self.paymentcounts = fi.paymenttimematrix(self.valuationdate, self.maturitydate, [f.value for f in self.frequency], [c.value for c in self.convention], self.calendar.value)
+        self.yieldcurve = v.validate_curve(yieldcurve, self.valuationdate, self.compounding, self.region, self.currency, self.calendar) if yieldcurve else getcurve(self.region, self.valuationdate, self.compounding, self.currency, self.calendar)
+        self.spotrates, self.forwardrates, self.tenorrates = self._rates()
+        self.discountfactors = fi.discount(self.paymenttimes, self.spotrates, self.compounding)
+        self.fixedcashflows = self._fixedcashflows()
+        self.floatingcashflows = self._floatingcashflows()
+        self.fixedprice = self._price(self.fixedcashflows)
+        self.floatingprice = self._price(self.floatingcashflows)
+        self.npv = self.fixedprice - self.floatingprice
+        self.annuity = self._annuity()
+        self.pv01 = self.notional * self.annuity * risk.BASISPOINT
+        self.parrate = self._parrates()
+        fixedmeasures = risk.riskmeasures(self.paymenttimes, self.fixedcashflows, self.spotrates, self.compounding)
+        floatingmeasures = risk.floatingriskmeasures(self.paymenttimes, np.where(self._mask(), (self.notional / self.periods)[:, None], 0.0), self.spotrates, self.tenorrates, self.compounding)
+        self.fixedduration = fixedmeasures['Modified Duration']
+        self.floatingduration = floatingmeasures['Modified Duration']
+        self.fixedconvexity = fixedmeasures['Convexity']
+        self.floatingconvexity = floatingmeasures['Convexity']
+        self.fixeddv01 = fixedmeasures['DV01']
+        self.floatingdv01 = floatingmeasures['DV01']
+        self.dv01 = self.fixeddv01 - self.floatingdv01
+        self.valuationtable = self._valuationtable()
+
+    def __repr__(self):
+        return f'SwapBook(size = {len(self):,}, valuationdate = {self.valuationdate.date()}, region = {self.region.value}, currency = {self.currency.value}, compounding = {self.compounding.value}, calendar = {self.calendar.value})'
+
+    def __len__(self):
+        return len(self.notional)
+
+    def _mask(self):
+        return np.arange(self.paymenttimes.shape[1]) < self.paymentcounts[:, None]
+
+    def _periods(self):
+        lookup = {f: fi.FREQMAP.get(f.value, None) for f in set(self.frequency)}
+        return np.array([lookup[f] for f in self.frequency], dtype = float)
+
+    def _rates(self):
+        mask = self._mask()
+        grid, inverse = np.unique(self.paymenttimes[mask], return_inverse = True)
+        spotrates = np.zeros(self.paymenttimes.shape)
+        forwardrates = np.zeros(self.paymenttimes.shape)
+        tenorrates = np.zeros(self.paymenttimes.shape)
+        if len(grid):
+            spotrates[mask] = self.yieldcurve.interpolate(grid, 'Spot Rate')[inverse]
+            forwardrates[mask] = self.yieldcurve.interpolate(grid, 'Forward Rate')[inverse]
+            tenorrates[mask] = self.yieldcurve.interpolate(grid + 1, 'Spot Rate')[inverse]
+        return spotrates, forwardrates, tenorrates
+
+    def _fixedcashflows(self):
+        return np.where(self._mask(), (self.notional * self.fixedrate / self.periods)[:, None], 0.0)
+
+    def _floatingcashflows(self):
+        return np.where(self._mask(), self.notional[:, None] * self.forwardrates / self.periods[:, None], 0.0)
+
+    def _price(self, cashflows):
+        return np.einsum('ij,ij->i', cashflows, self.discountfactors)
+
+    def _annuity(self):
+        return np.where(self._mask(), self.discountfactors, 0.0).sum(axis = -1) / self.periods
+
+    def _parrates(self):
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            return self.floatingprice / (self.notional * self.annuity)
+
+    def _valuationtable(self):
+        return pd.DataFrame({
+            'Notional': self.notional,
+            'Fixed Rate': self.fixedrate,
+            'Frequency': [f.value for f in self.frequency],
+            'Maturity Date': self.maturitydate,
+            'Convention': [c.value for c in self.convention],
+            'Fixed Leg': self.fixedprice,
+            'Floating Leg': self.floatingprice,
+            'NPV': self.npv,
+            'Par Rate': self.parrate,
+            'Annuity': self.annuity,
+            'PV01': self.pv01,
+            'DV01': self.dv01
+        })
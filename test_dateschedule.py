@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+import fixedincomeutils as fi
+from enums import Frequency
+
+
+def schedule(start, end, frequency):
+    return list(fi.dateschedule(start, end, frequency).strftime('%Y-%m-%d'))
+
+
+def test_dates_are_generated_backward_from_maturity():
+    assert schedule('2024-03-01', '2025-07-15', 'Semi-Annual') == ['2024-07-15', '2025-01-15', '2025-07-15']
+    assert schedule('2024-06-02', '2024-06-30', 'Weekly') == ['2024-06-02', '2024-06-09', '2024-06-16', '2024-06-23', '2024-06-30']
+
+
+def test_month_end_maturity_rolls_to_month_end():
+    assert schedule('2024-03-15', '2025-02-28', 'Semi-Annual') == ['2024-08-31', '2025-02-28']
+    assert schedule('2024-01-10', '2024-12-31', 'Quarterly') == ['2024-03-31', '2024-06-30', '2024-09-30', '2024-12-31']
+    assert schedule('2023-12-01', '2024-04-30', 'Monthly') == ['2023-12-31', '2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30']
+
+
+def test_day_is_clamped_in_short_months():
+    assert schedule('2023-06-01', '2025-08-30', 'Semi-Annual') == ['2023-08-30', '2024-02-29', '2024-08-30', '2025-02-28', '2025-08-30']
+    assert schedule('2024-01-01', '2024-05-30', 'Quarterly') == ['2024-02-29', '2024-05-30']
+
+
+@pytest.mark.parametrize('frequency', list(Frequency))
+@pytest.mark.parametrize('start, end', [('2024-06-02', '2024-06-03'), ('2024-01-15', '2034-11-30'), ('2020-02-29', '2031-02-28'), ('2024-06-03', '2024-06-03')])
+def test_maturity_is_always_included(frequency, start, end):
+    dates = fi.dateschedule(start, end, frequency)
+    assert dates[-1] == pd.Timestamp(end)
+    assert dates[0] >= pd.Timestamp(start)
+    assert np.all(np.diff(dates.values) > np.timedelta64(0, 'D'))
+
+
+def test_invalid_frequency():
+    with pytest.raises(ValueError, match = 'frequency'):
+        fi.dateschedule('2024-01-01', '2025-01-01', 'Fortnightly')
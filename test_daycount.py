@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+import daycount as dc
+import fixedincomeutils as fi
+from enums import Convention
+
+
+def scalar(starts, ends, convention):
+    return np.array([fi.yearfraction(s, e, convention.value) for s, e in zip(starts, ends)], dtype = float)
+
+
+def randompairs(size = 2000, seed = 0):
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp('1890-01-01') + pd.to_timedelta(rng.integers(0, 250 * 365, size), unit = 'D')
+    ends = starts + pd.to_timedelta(rng.integers(0, 40 * 365, size), unit = 'D')
+    return starts, ends
+
+
+def edgepairs():
+    anchors = pd.to_datetime([
+        '1900-02-28', '1900-03-01', '2000-02-28', '2000-02-29', '2000-03-01', '2100-02-28', '2100-03-01',
+        '2023-02-28', '2024-02-28', '2024-02-29', '2024-03-01', '2025-02-28',
+        '2023-01-31', '2023-03-31', '2023-05-30', '2023-08-31', '2024-01-30', '2024-01-31', '2024-07-31', '2024-12-31',
+        '1999-12-31', '2000-01-01', '2099-12-31', '2100-01-01'
+    ])
+    starts, ends = np.meshgrid(anchors, anchors, indexing = 'ij')
+    keep = starts <= ends
+    return pd.DatetimeIndex(starts[keep]), pd.DatetimeIndex(ends[keep])
+
+
+@pytest.mark.parametrize('convention', list(Convention))
+def test_yearfractions_matches_scalar_on_random_pairs(convention):
+    starts, ends = randompairs()
+    np.testing.assert_array_equal(dc.yearfractions(starts, ends, convention), scalar(starts, ends, convention))
+
+
+@pytest.mark.parametrize('convention', list(Convention))
+def test_yearfractions_matches_scalar_on_month_ends_and_century_years(convention):
+    starts, ends = edgepairs()
+    np.testing.assert_array_equal(dc.yearfractions(starts, ends, convention), scalar(starts, ends, convention))
+
+
+@pytest.mark.parametrize('convention', list(Convention))
+def test_yearfractions_broadcasts_scalar_start(convention):
+    start = pd.Timestamp('2024-02-29')
+    ends = pd.date_range('2024-02-29', periods = 60, freq = 'ME')
+    np.testing.assert_array_equal(dc.yearfractions(start, ends, convention), scalar([start] * len(ends), ends, convention))
+
+
+@pytest.mark.parametrize('year, expected', [(1900, False), (2000, True), (2100, False), (2024, True), (2023, False)])
+def test_isleapyear(year, expected):
+    assert bool(dc.isleapyear(year)) == expected
+    assert bool(fi.isleapyear(year)) == expected
+
+
+def test_isleapyear_vectorized():
+    years = np.array([1900, 2000, 2100, 2024, 2023])
+    np.testing.assert_array_equal(dc.isleapyear(years), [False, True, False, True, False])
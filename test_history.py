@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+import calibration as cb
+import history as h
+import spotsource as ss
+import yieldcurve as yc
+from bond import Bond
+
+
+@pytest.fixture
+def store(tmp_path):
+    source = ss.SyntheticSource()
+    days = pd.bdate_range('2024-07-01', '2024-07-31')
+    frame = pd.DataFrame([source.load(None, d).set_index('tenor')['spot'] for d in days], index = days)
+    store = ss.LocalSpotStore(str(tmp_path))
+    store.ingest(frame, 'United States')
+    return store
+
+
+def bond(valuationdate, yieldcurve = None):
+    return Bond(100, 0.04, 'Quarterly', '2026-07-20', valuationdate, 'Semi-Annual', 'Actual/365', 'United States', yieldcurve = yieldcurve)
+
+
+@pytest.mark.parametrize('date', ['2024-07-19', '2024-07-22', '2024-07-23'])
+def test_revaluehistory_matches_bond_around_rolled_coupon(store, date):
+    params = cb.calibrate(store.frame('United States'))
+    history = h.revaluehistory([bond('2024-07-01', yc.YieldCurve('United States', '2024-07-01', 'Semi-Annual', source = store))], '2024-07-01', '2024-07-31', source = store)
+    curve = yc.YieldCurve('United States', date, 'Semi-Annual', source = store, nssparams = params.loc[date].values)
+    assert history.loc[date].iloc[0] == pytest.approx(bond(date, curve).price, rel = 1e-12)
+
+
+def test_revaluehistory_rejects_start_before_valuation(store):
+    with pytest.raises(ValueError, match = 'start'):
+        h.revaluehistory([bond('2024-07-10', yc.YieldCurve('United States', '2024-07-10', 'Semi-Annual', source = store))], '2024-07-01', '2024-07-31', source = store)
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+import spotsource as ss
+
+
+def frame():
+    return pd.DataFrame({'Date': ['2024-01-02', '2024-01-03'], '1y': [0.05, 0.051], '10y': [0.04, 0.041]})
+
+
+def test_ingest_rejects_missing_date_column(tmp_path):
+    store = ss.LocalSpotStore(str(tmp_path))
+    with pytest.raises(ValueError, match = 'datecolumn'):
+        store.ingest(frame(), 'United States')
+    assert store.frame('United States') is None
+
+
+def test_ingest_named_date_column(tmp_path):
+    store = ss.LocalSpotStore(str(tmp_path))
+    assert store.ingest(frame(), 'United States', datecolumn = 'Date') == 2
+    assert list(store.dates('United States')) == list(pd.to_datetime(['2024-01-02', '2024-01-03']))
+
+
+def test_ingest_datetime_index(tmp_path):
+    store = ss.LocalSpotStore(str(tmp_path))
+    data = frame().set_index('Date')
+    data.index = pd.to_datetime(data.index)
+    assert store.ingest(data, 'United States') == 2
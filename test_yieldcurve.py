@@ -0,0 +1,68 @@
+import warnings
+import numpy as np
+import pytest
+import spotsource as ss
+import yieldcurve as yc
+
+
+def curve(method = None):
+    return yc.YieldCurve('United States', '2024-06-21', 'Semi-Annual', source = ss.SyntheticSource(), method = method)
+
+
+def spots(curve):
+    return curve.spotrates.set_index('tenor')['spot'].copy()
+
+
+def test_update_partial_tick_keeps_other_pillars():
+    c = curve()
+    before = spots(c)
+    far = c.interpolate(30, 'Spot Rate')
+    c.update({tenor: before[tenor] + 0.01 for tenor in ['1m', '2m', '3m', '6m', '1y', '2y']})
+    after = spots(c)
+    assert list(after.index) == list(before.index)
+    np.testing.assert_allclose(after[['1m', '2m', '3m', '6m', '1y', '2y']], before[['1m', '2m', '3m', '6m', '1y', '2y']] + 0.01)
+    np.testing.assert_array_equal(after[['3y', '5y', '10y', '20y', '30y']], before[['3y', '5y', '10y', '20y', '30y']])
+    assert abs(c.interpolate(30, 'Spot Rate') - far) < 0.001
+
+
+def test_update_single_quote_tick_refits():
+    c = curve()
+    before, params = spots(c), c.nssparams.copy()
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        c.update({'10y': before['10y'] + 0.002})
+    after = spots(c)
+    assert len(after) == len(before)
+    assert after['10y'] == pytest.approx(before['10y'] + 0.002)
+    assert not np.allclose(c.nssparams, params)
+
+
+def test_streaming_partial_tick_reprices_on_merged_curve():
+    import streaming as st
+    c = curve()
+    pricer = st.StreamingPricer(c)
+    pricer.register((np.array([1.0, 2.0, 5.0, 30.0]), np.array([5.0, 5.0, 5.0, 105.0])))
+    pricer.reprice()
+    result = pricer.update({'1y': spots(c)['1y'] + 0.0001})
+    assert len(pricer.yieldcurve.spotrates) == len(c.spotrates)
+    assert abs(result['Price Change'].iloc[0]) < 0.1
+
+
+@pytest.mark.parametrize('method', ['Cubic Spline', 'Monotone Cubic'])
+def test_spline_update_rebuilds_from_merged_pillars(method):
+    c = curve(method)
+    before = spots(c)
+    c.update({'1y': 0.05, '10y': 0.05})
+    after = spots(c)
+    assert len(c.spline.knots) == len(before)
+    assert after['1y'] == 0.05 and after['10y'] == 0.05
+    np.testing.assert_allclose(c.interpolate([3.0, 30.0], 'Spot Rate'), before[['3y', '30y']])
+
+
+@pytest.mark.parametrize('method', ['Cubic Spline', 'Monotone Cubic'])
+def test_spline_update_single_quote_tick(method):
+    c = curve(method)
+    before = spots(c)
+    c.update({'5y': before['5y'] + 0.001})
+    assert len(c.spline.knots) == len(before)
+    assert c.interpolate(5.0, 'Spot Rate') == pytest.approx(before['5y'] + 0.001)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import fixedincomeutils as fi
+import yieldsolver as ys
+from enums import Compounding
+
+YIELDS = np.array([-0.05, -0.01, 0.0, 0.001, 0.03, 0.08, 0.25])
+
+
+def bond(years = 10, coupon = 2.0, periods = 2):
+    times = np.arange(1, years * periods + 1) / periods
+    cashflows = np.full(len(times), coupon)
+    cashflows[-1] += 100
+    return times, cashflows
+
+
+def stack(count, times, cashflows):
+    return np.tile(times, (count, 1)), np.tile(cashflows, (count, 1))
+
+
+def padded(bonds):
+    width = max(len(t) for t, cf in bonds)
+    times, cashflows = np.zeros((len(bonds), width)), np.zeros((len(bonds), width))
+    for i, (t, cf) in enumerate(bonds):
+        times[i, :len(t)], cashflows[i, :len(cf)] = t, cf
+    return times, cashflows
+
+
+@pytest.mark.parametrize('compounding', list(Compounding))
+def test_yield_round_trip(compounding):
+    times, cashflows = stack(len(YIELDS), *bond())
+    prices = ys.pricefromyield(YIELDS, times, cashflows, compounding)
+    yields = ys.yieldtomaturity(prices, times, cashflows, compounding)
+    np.testing.assert_allclose(yields, YIELDS, atol = 1e-9)
+    np.testing.assert_allclose(ys.pricefromyield(yields, times, cashflows, compounding), prices, rtol = 1e-10)
+
+
+@pytest.mark.parametrize('compounding', list(Compounding))
+def test_zspread_round_trip(compounding):
+    spreads = np.array([-0.02, 0.0, 0.015])
+    times, cashflows = stack(len(spreads), *bond())
+    rates = 0.03 + 0.002 * np.log1p(times)
+    prices = (cashflows * fi.discount(times, rates + spreads[:, None], compounding)).sum(axis = -1)
+    np.testing.assert_allclose(ys.zspread(prices, times, cashflows, rates, compounding), spreads, atol = 1e-9)
+
+
+@pytest.mark.parametrize('compounding', list(Compounding))
+def test_unreachable_prices_return_nan(compounding):
+    prices = np.array([-5.0, 0.0, 1e-6, 1e300, 100.0])
+    times, cashflows = stack(len(prices), *bond())
+    yields = ys.yieldtomaturity(prices, times, cashflows, compounding)
+    assert np.isnan(yields[:4]).all()
+    assert np.isfinite(yields[4])
+
+
+@pytest.mark.parametrize('compounding', list(Compounding))
+def test_nan_prices_return_nan_without_affecting_other_rows(compounding):
+    prices = np.array([np.nan, 95.0, np.inf, 105.0])
+    times, cashflows = stack(len(prices), *bond())
+    yields = ys.yieldtomaturity(prices, times, cashflows, compounding)
+    assert np.isnan(yields[[0, 2]]).all()
+    np.testing.assert_allclose(yields[[1, 3]], ys.yieldtomaturity([95.0, 105.0], times[:2], cashflows[:2], compounding))
+
+
+@pytest.mark.parametrize('compounding', list(Compounding))
+def test_padded_zero_cashflow_columns(compounding):
+    bonds = [bond(1, 3.0), bond(5, 2.0, 4), bond(30, 2.5)]
+    times, cashflows = padded(bonds)
+    prices = np.array([101.0, 97.0, 88.0])
+    yields = ys.yieldtomaturity(prices, times, cashflows, compounding)
+    expected = [ys.yieldtomaturity(p, t, cf, compounding)[0] for p, (t, cf) in zip(prices, bonds)]
+    np.testing.assert_allclose(yields, expected, atol = 1e-12)
+    np.testing.assert_allclose(ys.pricefromyield(yields, times, cashflows, compounding), prices, rtol = 1e-10)
+
+
+def test_invalid_compounding():
+    times, cashflows = bond()
+    with pytest.raises(ValueError, match = 'compounding'):
+        ys.yieldtomaturity(100.0, times, cashflows, 'Daily')
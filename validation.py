@@ -1,6 +1,8 @@
 import pandas as pd
-import pandas_market_calendars as mcal
+import numpy as np
+import businessdays as bd
 from enums import Compounding, Region, Calendar, Currency
+from profiling import timed
 
 
 def validate_enum(value, enum_class, name):
@@ -11,17 +13,42 @@ def validate_enum(value, enum_class, name):
         raise ValueError(f'Invalid {name}: {value}. Choose from {valid_values}')
     
 
+@timed
 def validate_date(date_str, calendar: Calendar):
     try:
-        date = pd.to_datetime(date_str)
+        date = pd.Timestamp(date_str)
     except ValueError:
         raise ValueError(f'Invalid date: {date_str}. Use format YYYY-MM-DD')
     
-    cal = mcal.get_calendar(calendar.value)
-    if not cal.valid_days(start_date = date, end_date = date).size:
-        raise ValueError(f'Invalid date: {date_str}. Not a valid trading day. Next valid date is {cal.valid_days(start_date = date, end_date = date + pd.DateOffset(days = 14)).min()}')
+    index = bd.businessdayindex(calendar, date, date)
+    if not index.isbusinessday(date)[0]:
+        raise ValueError(f'Invalid date: {date_str}. Not a valid trading day. Next valid date is {pd.Timestamp(index.following(date)[0]).date()}')
     return date
 
+def validate_enum_column(column, enum_class, name):
+    lookup = {x: validate_enum(x, enum_class, name) for x in set(column)}
+    return np.array([lookup[x] for x in column], dtype = object)
+
+@timed
+def validate_date_column(column, calendar: Calendar):
+    dates = pd.DatetimeIndex(pd.to_datetime(pd.Series(column)))
+    days = np.asarray(dates.values, dtype = 'datetime64[D]')
+    invalid = dates[~bd.businessdayindex(calendar, days.min(), days.max()).isbusinessday(days)] if len(days) else dates
+    if len(invalid):
+        raise ValueError(f'Invalid date: {invalid[0].date()}. Not a valid trading day.')
+    return dates
+
+def validate_curve(yieldcurve, date, compounding, region = None, currency = None, calendar = None):
+    if yieldcurve.date != date:
+        raise ValueError(f'Invalid yield curve: curve date {yieldcurve.date.date()} does not match valuation date {date.date()}')
+    if yieldcurve.compounding != compounding:
+        raise ValueError(f'Invalid yield curve: curve compounding {yieldcurve.compounding.value} does not match {compounding.value}')
+    for name, expected in (('region', region), ('currency', currency), ('calendar', calendar)):
+        actual = getattr(yieldcurve, name)
+        if expected is not None and actual != expected:
+            raise ValueError(f'Invalid yield curve: curve {name} {actual.value} does not match {expected.value}')
+    return yieldcurve
+
 def default_calendar(region: Region):
     CALENDARMAP = {
         Region.US: Calendar.US,
@@ -1,78 +1,218 @@
+import logging
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import ustreasurycurve as ustc
+import pandas as pd
+import threading
+from collections import OrderedDict
 import warnings
 import fixedincomeutils as fi
 import validation as v
-from scipy.optimize import curve_fit
-from enums import Compounding, Region, Currency, InterpolationType, Calendar
+import spotsource as ss
+import calibration as cb
+from splinecurve import SplineCurve
+from enums import Compounding, Region, Currency, InterpolationType, Calendar, CurveMethod
+from profiling import timed
+
+logger = logging.getLogger(__name__)
 
 
 
 class YieldCurve:
+    __slots__ = ('region', 'currency', 'calendar', 'compounding', 'date', 'source', 'method', '_cache')
 
-    def __init__(self, region, date, compounding, currency = None, calendar = None):
+    @timed
+    def __init__(self, region, date, compounding, currency = None, calendar = None, source = None, nssparams = None, method = None):
         self.region = v.validate_enum(region, Region, 'region')
         self.currency = v.validate_enum(currency, Currency, 'currency') if currency else v.default_currency(self.region)
         self.calendar = v.validate_enum(calendar, Calendar, 'calendar') if calendar else v.default_calendar(self.region)
         self.compounding = v.validate_enum(compounding, Compounding, 'compounding')
         self.date = v.validate_date(date, self.calendar)
-        print(self.__repr__())
-        self.spotrates = self._load_spots()
-        self.nssparams = self._calculate_params()
+        self.source = source if source else ss.getdefaultsource()
+        self.method = v.validate_enum(method, CurveMethod, 'method') if method else CurveMethod.NSS
+        if nssparams is not None and self.method != CurveMethod.NSS:
+            raise ValueError(f'Invalid nssparams: a {self.method.value} curve is built from spot rates, not NSS parameters')
+        self._cache = {} if nssparams is None else {'spotrates': None, 'nssparams': np.asarray(nssparams, dtype = float)}
+        logger.debug('%r', self)
+
+
+    def __copy__(self):
+        curve = YieldCurve.__new__(YieldCurve)
+        for name in self.__slots__:
+            setattr(curve, name, getattr(self, name))
+        curve._cache = dict(self._cache)
+        return curve
 
 
     def __repr__(self):
-        return f'YieldCurve(region = {self.region.value}, date = {self.date.date()}, compounding = {self.compounding.value}, currency = {self.currency.value}, calendar = {self.calendar.value})'
+        return f'YieldCurve(region = {self.region.value}, date = {self.date.date()}, compounding = {self.compounding.value}, currency = {self.currency.value}, calendar = {self.calendar.value}, method = {self.method.value})'
+
+
+    @fi.lazyproperty
+    def spotrates(self):
+        return self._load_spots()
+
+
+    @fi.lazyproperty
+    def nssparams(self):
+        return self._calculate_params()
+
+
+    @fi.lazyproperty
+    def spline(self):
+        ts = self.spotrates
+        return SplineCurve(ts['time'], ts['spot'], self.method)
 
 
+    @timed
     def _load_spots(self):
-        TENORMAP = {'1m':1/12,'2m':1/6,'3m':0.25,'6m':0.5,'1y':1,'2y':2,'3y':3,'5y':5,'10y':10,'20y':20,'30y':30}
-        if self.region == Region.US:
-            warnings.simplefilter('ignore', category = UserWarning)
-            ts = ustc.nominalRates(date_start = self.date, date_end = self.date)
-            warnings.simplefilter('default', category = UserWarning)
-            ts = ts.iloc[:,1:].melt(var_name = 'tenor', value_name = 'spot')
-            ts['time'] = ts['tenor'].map(TENORMAP)
-            return ts[['tenor','time','spot']].dropna()
+        ts = self.source.load(self.region, self.date)
+        if ts is None or ts.empty:
+            raise ValueError(f'No spot rates for {self.region.value} on {self.date.date()} from {self.source}')
+        return ts
         
 
+    @timed
     def _calculate_params(self, initial = None):
         ts = self.spotrates
-        if initial is None:
-            initial = [0.03, -0.02, 0.01, 0.05, 2.0, 5.0]        
         try:
-            return curve_fit(fi.nelsonsiegelsvensson, ts['time'], ts['spot'], p0 = initial)[0]
+            return cb.fitnss(ts['time'], ts['spot'], initial)
         except (RuntimeError, ValueError) as e:
             warnings.warn(f'Curve fitting failed: {e}', RuntimeWarning)
         return None
 
-    
-    def interpolate(self, t, type):
+
+    def _merge(self, spots):
+        spots = spots.set_index('tenor')['spot'] if isinstance(spots, pd.DataFrame) else pd.Series(spots, dtype = float)
+        current = self.spotrates
+        if current is not None:
+            spots = pd.concat([current.set_index('tenor')['spot'], spots])
+            spots = spots[~spots.index.duplicated(keep = 'last')]
+        return ss.spotframe(spots.index, spots.values).sort_values('time').reset_index(drop = True)
+
+
+    @timed
+    def update(self, spots):
+        spots = self._merge(spots)
+        if self.method != CurveMethod.NSS:
+            spline = SplineCurve(spots['time'], spots['spot'], self.method)
+            self._cache['spotrates'] = spots
+            self._cache['spline'] = spline
+            return spline
+        params = cb.refit(spots['time'], spots['spot'], self.nssparams)
+        if np.isnan(params).all():
+            warnings.warn(f'Curve update failed for {self.region.value} on {self.date.date()}. Keeping previous parameters.', RuntimeWarning)
+            return self.nssparams
+        self._cache['spotrates'] = spots
+        self._cache['nssparams'] = params
+        return params
+
+
+    @timed
+    def interpolate(self, t, type, tenor = 1):
         type = v.validate_enum(type, InterpolationType, 'type')
+        t = np.asarray(t, dtype = float)
+        if self.method == CurveMethod.NSS:
+            spot = lambda t: fi.nelsonsiegelsvensson(t, *self.nssparams)
+            marginal = lambda t: fi.nssmarginal(t, *self.nssparams)
+        else:
+            spot, marginal = self.spline, self.spline.marginal
         if type == InterpolationType.SPOT:
-            return fi.nelsonsiegelsvensson(t, *self.nssparams)
+            return spot(t)
         elif type == InterpolationType.DISCOUNT:
-            return fi.discount(t, fi.nelsonsiegelsvensson(t, *self.nssparams), self.compounding)
+            return fi.discount(t, spot(t), self.compounding)
         elif type == InterpolationType.FORWARD:
-            spots = fi.nelsonsiegelsvensson(t, *self.nssparams)
-            return [fi.forward(timeA = t[i], rateA = spots[i], timeB = t[i] + 1, rateB = fi.nelsonsiegelsvensson(t[i] + 1, *self.nssparams), compounding = self.compounding) for i in range(len(t))]
+            return fi.forward(t, spot(t), t + tenor, spot(t + tenor), self.compounding)
+        elif type == InterpolationType.INSTANTANEOUS:
+            return fi.instantaneousforward(spot(t), marginal(t), self.compounding)
     
 
     def plot(self, type):
-        PLOTSTYLE = {'axes.edgecolor':'#505258', 'grid.linestyle':'dashed', 'grid.color':'white', 'axes.facecolor':'#E8E9EB'}
-        sns.set_style('whitegrid', rc = PLOTSTYLE)
-        COLORMAP = {'Spot Rate':'#4062BB','Discount Factor':'#357266','Forward Rate':'#FF495C'}
-        ts = self.spotrates
-        ts[type] = self.interpolate(ts['time'], type)
-        t = np.linspace(0, np.max(ts['time']), 100)
-        y = self.interpolate(t, type)
-        plt.figure(figsize = (12,8))
-        sns.lineplot(x = t, y = y, linestyle = '-', linewidth = 2, color = COLORMAP[type])
-        sns.scatterplot(x = ts['time'], y = ts[type], marker = 'o', s = 75, color = COLORMAP[type]) 
-        plt.title(f'{self.region.value} {type} Term Structure ({self.date.date()})')
-        plt.xlabel('Maturity')
-        plt.ylabel(type)
-        plt.grid(True, axis = 'y')
-        plt.show()
\ No newline at end of file
+        import plotting
+        return plotting.plotcurve(self, type)
+
+
+class CurveCache:
+
+    def __init__(self, maxsize = 64):
+        self.maxsize = maxsize
+        self.curves = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+
+
+    def __repr__(self):
+        return f'CurveCache(size = {len(self)}, maxsize = {self.maxsize}, hits = {self.hits}, misses = {self.misses})'
+
+
+    def __len__(self):
+        return len(self.curves)
+
+
+    def _key(self, region, date, compounding, currency = None, calendar = None, source = None, method = None):
+        region = v.validate_enum(region, Region, 'region')
+        currency = v.validate_enum(currency, Currency, 'currency') if currency else v.default_currency(region)
+        calendar = v.validate_enum(calendar, Calendar, 'calendar') if calendar else v.default_calendar(region)
+        compounding = v.validate_enum(compounding, Compounding, 'compounding')
+        source = source if source else ss.getdefaultsource()
+        method = v.validate_enum(method, CurveMethod, 'method') if method else CurveMethod.NSS
+        return (region, pd.to_datetime(date).normalize(), compounding, currency, calendar, source, method)
+
+
+    def get(self, region, date, compounding, currency = None, calendar = None, source = None, method = None):
+        key = self._key(region, date, compounding, currency, calendar, source, method)
+        with self._lock:
+            if key in self.curves:
+                self.hits += 1
+                self.curves.move_to_end(key)
+                return self.curves[key]
+            self.misses += 1
+        curve = YieldCurve(*key[:6], method = key[6])
+        self.put(curve)
+        return curve
+
+
+    def put(self, curve):
+        key = self._key(curve.region, curve.date, curve.compounding, curve.currency, curve.calendar, curve.source, curve.method)
+        with self._lock:
+            self.curves[key] = curve
+            self.curves.move_to_end(key)
+            while len(self.curves) > self.maxsize:
+                self.curves.popitem(last = False)
+
+
+    def invalidate(self, region = None, date = None, compounding = None, currency = None, calendar = None, source = None, method = None):
+        filters = [
+            v.validate_enum(region, Region, 'region') if region else None,
+            pd.to_datetime(date).normalize() if date is not None else None,
+            v.validate_enum(compounding, Compounding, 'compounding') if compounding else None,
+            v.validate_enum(currency, Currency, 'currency') if currency else None,
+            v.validate_enum(calendar, Calendar, 'calendar') if calendar else None,
+            source,
+            v.validate_enum(method, CurveMethod, 'method') if method else None
+        ]
+        with self._lock:
+            stale = [key for key in self.curves if all(f is None or f == k for f, k in zip(filters, key))]
+            for key in stale:
+                del self.curves[key]
+        return len(stale)
+
+
+    def clear(self):
+        with self._lock:
+            self.curves.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self.curves) > self.maxsize:
+                self.curves.popitem(last = False)
+
+
+CURVECACHE = CurveCache()
+
+@timed
+def getcurve(region, date, compounding, currency = None, calendar = None, source = None, method = None):
+    return CURVECACHE.get(region, date, compounding, currency, calendar, source, method)
\ No newline at end of file
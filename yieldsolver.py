@@ -0,0 +1,112 @@
+import numpy as np
+import fixedincomeutils as fi
+from enums import Compounding
+
+TOLERANCE = 1e-10
+MAXITERATIONS = 50
+UPPERBOUND = 10.0
+
+
+def _dot(a, b):
+    return np.einsum('ij,ij->i', a, b)
+
+
+class _Lanes:
+
+    def __init__(self, rows, times, cashflows, rates, compounding):
+        self.rows = rows
+        self.k = None if compounding == Compounding.CONTINUOUS else fi.COMPOUND_MAP.get(compounding, None)
+        self.flat = rates is None
+        if self.k is None:
+            self.times = times
+            self.weights = cashflows if self.flat else cashflows * np.exp(-times * rates)
+            self.first = times * self.weights
+            self.second = times * self.first
+        else:
+            self.times = -self.k * times
+            self.weights = cashflows
+            self.first = times * cashflows
+            self.second = (times + 1 / self.k) * self.first
+        self.rates = None if self.flat else rates
+
+
+    def compress(self, live):
+        self.rows = self.rows[live]
+        for name in ('times', 'weights', 'first', 'second', 'rates'):
+            if getattr(self, name) is not None:
+                setattr(self, name, getattr(self, name)[live])
+
+
+    def evaluate(self, spread):
+        if self.k is None:
+            e = np.exp(-self.times * spread[:, None])
+            return _dot(self.weights, e), -_dot(self.first, e), _dot(self.second, e)
+        if self.flat:
+            growth = 1 + spread / self.k
+            e = np.exp(self.times * np.log(growth)[:, None])
+            return _dot(self.weights, e), -_dot(self.first, e) / growth, _dot(self.second, e) / growth ** 2
+        growth = 1 + (self.rates + spread[:, None]) / self.k
+        e = np.exp(self.times * np.log(growth))
+        return _dot(self.weights, e), -_dot(self.first / growth, e), _dot(self.second / growth ** 2, e)
+
+
+def solvespread(prices, times, cashflows, rates, compounding, tolerance = TOLERANCE, maxiterations = MAXITERATIONS):
+    if rates is None:
+        times, cashflows = np.broadcast_arrays(*[np.atleast_2d(np.asarray(x, dtype = float)) for x in (times, cashflows)])
+    else:
+        times, cashflows, rates = np.broadcast_arrays(*[np.atleast_2d(np.asarray(x, dtype = float)) for x in (times, cashflows, rates)])
+    prices = np.broadcast_to(np.asarray(prices, dtype = float), times.shape[:1])
+    if compounding != Compounding.CONTINUOUS and fi.COMPOUND_MAP.get(compounding, None) is None:
+        raise ValueError(f'Invalid compounding type: {compounding}')
+
+    finite = np.isfinite(prices)
+    rows = np.flatnonzero(finite)
+    select = slice(None) if finite.all() else rows
+    lanes = _Lanes(rows, times[select], cashflows[select], None if rates is None else rates[select], compounding)
+    spread = np.full(len(prices), np.nan)
+    s = np.zeros(len(rows))
+    if lanes.k is None:
+        lo = np.full(len(rows), -UPPERBOUND)
+    else:
+        lo = -lanes.k * (1 - 1e-9) - (0 if lanes.flat else lanes.rates.min(axis = -1, initial = np.inf))
+    hi = np.full(len(rows), UPPERBOUND)
+    target = prices[rows]
+
+    done = np.zeros(len(s), dtype = bool)
+    for _ in range(maxiterations):
+        if done.all():
+            break
+        value, first, second = lanes.evaluate(s)
+        error = value - target
+        lo = np.where(error > 0, s, lo)
+        hi = np.where(error < 0, s, hi)
+        with np.errstate(divide = 'ignore', invalid = 'ignore', over = 'ignore'):
+            newton = error / first
+            proposal = s - newton / (1 - 0.5 * newton * second / first)
+        bisect = ~np.isfinite(proposal) | (proposal <= lo) | (proposal >= hi)
+        proposal = np.where(bisect, 0.5 * (lo + hi), proposal)
+        accurate = np.abs(error) < tolerance * np.maximum(np.abs(target), 1)
+        converged = ~done & (accurate | (~bisect & (np.abs(proposal - s) < tolerance)))
+        spread[lanes.rows[converged]] = np.where(accurate, s, proposal)[converged]
+        done |= converged
+        s = np.where(done, s, proposal)
+
+        if 2 * done.sum() > len(done):
+            live = ~done
+            lanes.compress(live)
+            s, lo, hi, target, done = s[live], lo[live], hi[live], target[live], done[live]
+    return spread
+
+
+def yieldtomaturity(prices, times, cashflows, compounding, **kwargs):
+    return solvespread(prices, times, cashflows, None, compounding, **kwargs)
+
+
+def pricefromyield(yields, times, cashflows, compounding):
+    times, cashflows = np.broadcast_arrays(*[np.atleast_2d(np.asarray(x, dtype = float)) for x in (times, cashflows)])
+    yields = np.broadcast_to(np.asarray(yields, dtype = float), times.shape[:1])
+    return (cashflows * fi.discount(times, yields[:, None], compounding)).sum(axis = -1)
+
+
+def zspread(prices, times, cashflows, rates, compounding, **kwargs):
+    return solvespread(prices, times, cashflows, rates, compounding, **kwargs)